@@ -1,6 +1,7 @@
 """
 Simple Flask Backend for Finger Counter
 - No camera required (processes frames from frontend)
+- Optional server-side hand detection when mediapipe/opencv are installed
 - Lightweight and cloud-friendly
 - Works on Railway, Render, Heroku
 """
@@ -8,9 +9,15 @@ Simple Flask Backend for Finger Counter
 import os
 import sys
 import json
+import base64
+import binascii
+from concurrent.futures import TimeoutError as DetectTimeoutError
+from concurrent.futures.process import BrokenProcessPool
 from flask import Flask, render_template, jsonify, request
 from flask_cors import CORS
 
+import detector_pool
+
 app = Flask(__name__, template_folder='templates')
 CORS(app)
 
@@ -19,6 +26,22 @@ game_state = {
     'status': 'ready'
 }
 
+# Upload formats accepted by /api/process-frame besides base64 JSON
+BINARY_IMAGE_TYPES = {'image/jpeg', 'image/webp', 'image/png'}
+RAW_FRAME_CHANNELS = {'rgb24': 3, 'rgba': 4}
+
+# Server-side detection is only enabled when its dependencies are installed
+SERVER_DETECTION = detector_pool.available() and os.environ.get('SERVER_DETECTION', 'True').lower() == 'true'
+
+class UnsupportedUploadType(Exception):
+    """The request body is not in one of the accepted upload formats."""
+
+def decode_frame_data(frame_data):
+    """Decode a base64 frame, accepting an optional data URL prefix."""
+    if frame_data.startswith('data:'):
+        frame_data = frame_data.split(',', 1)[1]
+    return base64.b64decode(frame_data, validate=True)
+
 @app.route('/', methods=['GET'])
 def index():
     """Serve the main game page"""
@@ -38,6 +61,8 @@ def status():
     """Get current game status"""
     return jsonify({
         'game_status': game_state['status'],
+        'server_detection': SERVER_DETECTION,
+        'batching': detector_pool.batcher_stats(),
         'ready': True
     }), 200
 
@@ -46,32 +71,91 @@ def process_frame():
     """
     Process frame from frontend
     
-    Expected POST data:
-    {
-        'frameData': base64_encoded_image,
-        'width': number,
-        'height': number
-    }
+    Expected POST data, one of:
+    - JSON: {'frameData': base64_encoded_image, 'width': number, 'height': number}
+    - Raw image body with Content-Type image/jpeg, image/webp or image/png
+    - Raw pixels with Content-Type application/octet-stream, X-Frame-Format
+      (rgb24 or rgba) and X-Frame-Width / X-Frame-Height headers
+    - multipart/form-data with the image in a 'frame' file field
     """
     try:
-        data = request.get_json()
+        if request.mimetype == 'application/json':
+            data = request.get_json(silent=True)
+            if not isinstance(data, dict) or 'frameData' not in data:
+                return jsonify({'error': 'No frame data provided'}), 400
+        
+        if not SERVER_DETECTION:
+            # The frontend handles MediaPipe processing
+            return jsonify({
+                'finger_count': 0,
+                'extended_fingers': [],
+                'palm_facing': False,
+                'server_detection': False,
+                'success': True
+            }), 200
         
-        if not data or 'frameData' not in data:
-            return jsonify({'error': 'No frame data provided'}), 400
+        try:
+            decoder, args = read_frame_upload()
+        except UnsupportedUploadType as e:
+            return jsonify({'error': str(e)}), 415
+        except (binascii.Error, ValueError) as e:
+            return jsonify({'error': f'Invalid frame data: {e}'}), 400
         
-        # For now, return dummy data
-        # The frontend handles MediaPipe processing
-        return jsonify({
-            'finger_count': 0,
-            'extended_fingers': [],
-            'palm_facing': False,
-            'success': True
-        }), 200
+        try:
+            future = detector_pool.get_batcher().submit((decoder, args))
+            result = future.result(timeout=detector_pool.DETECT_TIMEOUT + detector_pool.BATCH_WINDOW_MS / 1000.0)
+        except DetectTimeoutError:
+            return jsonify({'error': 'Detection timed out'}), 503
+        except BrokenProcessPool:
+            # get_pool() replaces the pool on the next request
+            return jsonify({'error': 'Detector restarting'}), 503
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        result['server_detection'] = True
+        result['success'] = True
+        return jsonify(result), 200
         
     except Exception as e:
         print(f"Error processing frame: {e}")
         return jsonify({'error': str(e)}), 500
 
+def read_frame_upload():
+    """Return the decoder function and arguments for the uploaded frame."""
+    mimetype = request.mimetype
+    
+    if mimetype in BINARY_IMAGE_TYPES:
+        # Raw compressed image: hand the body straight to the decoder
+        body = request.get_data(cache=False)
+        if not body:
+            raise ValueError('empty body')
+        return detector_pool.decode_encoded, (body,)
+    
+    if mimetype == 'application/octet-stream':
+        body = request.get_data(cache=False)
+        frame_format = request.headers.get('X-Frame-Format', 'rgb24').lower()
+        if frame_format not in RAW_FRAME_CHANNELS:
+            raise ValueError(f'unsupported X-Frame-Format {frame_format}')
+        width = request.headers.get('X-Frame-Width', type=int)
+        height = request.headers.get('X-Frame-Height', type=int)
+        if not width or not height:
+            raise ValueError('X-Frame-Width and X-Frame-Height are required for raw pixels')
+        return detector_pool.decode_raw, (body, width, height, RAW_FRAME_CHANNELS[frame_format])
+    
+    if mimetype == 'multipart/form-data':
+        upload = request.files.get('frame')
+        if upload is None:
+            raise ValueError("missing 'frame' file field")
+        return detector_pool.decode_encoded, (upload.read(),)
+    
+    if mimetype != 'application/json':
+        raise UnsupportedUploadType(f"unsupported Content-Type {mimetype or '(none)'}")
+    data = request.get_json(silent=True)
+    frame_data = data.get('frameData') if isinstance(data, dict) else None
+    if not isinstance(frame_data, str):
+        raise ValueError("'frameData' must be a base64 string")
+    return detector_pool.decode_encoded, (decode_frame_data(frame_data),)
+
 @app.route('/favicon.ico')
 def favicon():
     """Return a simple favicon to suppress 404"""
@@ -1,309 +1,581 @@
 import cv2
-import mediapipe as mp
-import numpy as np
-import math
 import base64
+import json
 import traceback
 import sys
 import os
+import atexit
+import signal
 from io import BytesIO
-from flask import Flask, render_template, Response, jsonify, send_file
+from flask import Flask, render_template, Response, jsonify, send_file, request, abort
 from flask_cors import CORS
-import threading
 import time
 
+import landmark_engine
+from camera_capture import LatestFrameCapture
+from frame_pipeline import FramePipeline
+from frame_scheduler import FrameScheduler
+from motion_gate import MotionGate
+from frame_encoder import AdaptiveEncoder
+from hand_detector import HandDetector, draw_hands
+from landmark_recording import LandmarkRecorder
+from stage_metrics import StageMetrics
+from stream_worker import StreamProcess, parse_streams
+from state_snapshot import StateSnapshot, SnapshotPublisher
+
 app = Flask(__name__)
 CORS(app)
 
-# Initialize MediaPipe Hands
-mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(
-    static_image_mode=False,
-    max_num_hands=2,
-    min_detection_confidence=0.7,
-    min_tracking_confidence=0.7
-)
-mp_drawing = mp.solutions.drawing_utils
-
-# Game state (shared across requests)
-game_state = {
-    'finger_count': 0,
-    'extended_fingers': [],
-    'palm_facing': False,
-    'frame_data': None,
-    'frame_timestamp': 0,
-    'last_frame_time': 0
-}
+ROI_TRACKING = os.environ.get('ROI_TRACKING', 'True').lower() == 'true'  # Detect on a crop around the last hands
+SMOOTHING = os.environ.get('SMOOTHING', 'True').lower() == 'true'  # EMA, hysteresis and k-of-n vote on counts
+
+# Seconds spent in each startup phase, reported by /api/ready and /api/metrics
+startup_phases = {}
+processing_started_at = None
+warmed_up = False
+
+# Per-stage latency histograms and request counters, served at /api/metrics
+metrics = StageMetrics(('capture', 'convert', 'inference', 'classify', 'draw', 'encode', 'publish'))
+
+STREAMS = os.environ.get('STREAMS', '')  # 'name=source,...': one worker process per source instead of the single pipeline
+INFERENCE_PROCESS = os.environ.get('INFERENCE_PROCESS', 'False').lower() == 'true'  # Detect and annotate outside the web process
+RING_SLOTS = int(os.environ.get('RING_SLOTS', 4))  # Shared-memory frame slots between each stream's capture and detector processes
+
+# Initialize MediaPipe Hands (worker processes own their detectors in the modes above)
+detector = None
+if not (STREAMS or INFERENCE_PROCESS):
+    phase_start = time.perf_counter()
+    detector = HandDetector(roi_tracking=ROI_TRACKING, smoothing=SMOOTHING, observe=metrics.observe)
+    startup_phases['detector_init'] = time.perf_counter() - phase_start
+
+# Game state (shared across requests), published as immutable snapshots
+published = SnapshotPublisher()
 
 # Video capture
 cap = None
-lock = threading.Lock()
-FPS_TARGET = 15  # Target 15 FPS for smoother performance
-process_thread = None
+SSE_HEARTBEAT = 15  # Seconds between keep-alive comments on idle event streams
+LONG_POLL_DEFAULT = 10  # Seconds a long-poll request waits for a newer frame or state
+LONG_POLL_MAX = 30
+HEALTH_CACHE_TTL = 0.5  # Seconds a serialized /api/health body is reused
+health_cache = (0.0, None)
+FPS_TARGET = float(os.environ.get('FPS_TARGET', 15))  # Target 15 FPS for smoother performance
+LATENCY_BUDGET_MS = float(os.environ.get('LATENCY_BUDGET_MS', 0)) or None  # Optional per-frame latency budget, reported as over_budget
+PIPELINE_QUEUE_SIZE = 2  # Frames buffered between stages before the oldest is dropped
+pipeline = None
+scheduler = FrameScheduler(FPS_TARGET, LATENCY_BUDGET_MS)
+MOTION_THRESHOLD = float(os.environ.get('MOTION_THRESHOLD', 0.001))  # Fraction of changed thumbnail pixels needed to reprocess; 0 disables
+MOTION_PIXEL_THRESHOLD = int(os.environ.get('MOTION_PIXEL_THRESHOLD', 20))  # Gray-level change for a pixel to count
+motion_gate = MotionGate(MOTION_THRESHOLD, MOTION_PIXEL_THRESHOLD) if MOTION_THRESHOLD > 0 else None
+ENCODE_BUDGET_MS = float(os.environ.get('ENCODE_BUDGET_MS', 15))  # Step down the quality ladder above this
+encoder = AdaptiveEncoder(budget_ms=ENCODE_BUDGET_MS, observe=metrics.observe)
+RECORD_LANDMARKS = os.environ.get('RECORD_LANDMARKS')  # Optional path for a binary landmark recording
+recorder = None
+streams = {}
 thread_alive = False
 thread_errors = []
 
-# Helper function to calculate distance
-def distance(p1, p2):
-    return math.sqrt((p1.x - p2.x)**2 + (p1.y - p2.y)**2 + (p1.z - p2.z)**2)
-
-# Helper function for vector
-def vec(a, b):
-    return np.array([b.x - a.x, b.y - a.y, b.z - a.z], dtype=float)
-
 def is_palm_facing_camera(hand_landmarks):
     """Estimate whether the palm is facing the camera."""
-    lm = hand_landmarks.landmark
-    wrist = lm[0]
-    index_mcp = lm[5]
-    pinky_mcp = lm[17]
-    
-    v1 = np.array([index_mcp.x - wrist.x, index_mcp.y - wrist.y, index_mcp.z - wrist.z])
-    v2 = np.array([pinky_mcp.x - wrist.x, pinky_mcp.y - wrist.y, pinky_mcp.z - wrist.z])
-    normal = np.cross(v1, v2)
-    
-    tips = [lm[4], lm[8], lm[12], lm[16], lm[20]]
-    avg_tips_z = sum([t.z for t in tips]) / len(tips)
-    
-    palm_toward = (normal[2] < 0) or (avg_tips_z < wrist.z)
-    return bool(palm_toward)
+    points = landmark_engine.landmarks_to_array([hand_landmarks])
+    return bool(landmark_engine.palm_facing(points)[0])
 
 def count_extended_fingers(hand_landmarks):
     """Count extended fingers using angle-based detection."""
-    lm = hand_landmarks.landmark
-    
-    extended = []
-    
-    # Finger indices: thumb, index, middle, ring, pinky
-    finger_indices = {
-        0: (1, 2, 3, 4),   # thumb: CMC, MCP, IP, TIP
-        1: (5, 6, 8),      # index: MCP, PIP, TIP
-        2: (9, 10, 12),    # middle
-        3: (13, 14, 16),   # ring
-        4: (17, 18, 20)    # pinky
-    }
-    
-    COS_THRESHOLD = -0.5
-    
-    for f in range(5):
-        if f == 0:
-            # Thumb: use vectors tip->ip and ip->mcp
-            tip = lm[4]
-            ip = lm[3]
-            mcp = lm[2]
-            v1 = vec(ip, tip)
-            v2 = vec(ip, mcp)
-        else:
-            mcp = lm[finger_indices[f][0]]
-            pip = lm[finger_indices[f][1]]
-            tip = lm[finger_indices[f][2]]
-            v1 = vec(pip, tip)
-            v2 = vec(pip, mcp)
-        
-        denom = (np.linalg.norm(v1) * np.linalg.norm(v2))
-        cosang = 1.0
-        if denom > 1e-6:
-            cosang = np.dot(v1, v2) / denom
-        
-        if cosang < COS_THRESHOLD:
-            extended.append(f)
-    
-    palm = is_palm_facing_camera(hand_landmarks)
-    return len(extended), extended, palm
+    points = landmark_engine.landmarks_to_array([hand_landmarks])
+    counts, extended, palm = landmark_engine.classify_hands(points)
+    return int(counts[0]), landmark_engine.extended_list(extended[0]), bool(palm[0])
+
+def camera_source():
+    """CAMERA_SOURCE may be a device index or a video file/stream URL."""
+    source = os.environ.get('CAMERA_SOURCE', '0')
+    return int(source) if source.isdigit() else source
 
 def init_camera():
     """Initialize camera capture."""
     global cap
     try:
-        cap = cv2.VideoCapture(0)
+        # A drain thread keeps only the newest frame, so reads are never stale
+        cap = LatestFrameCapture(camera_source(), width=1280, height=720, fps=30)
         if not cap.isOpened():
             print("ERROR: Cannot open camera")
             return False
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-        cap.set(cv2.CAP_PROP_FPS, 30)
         print("Camera initialized successfully")
         return True
     except Exception as e:
         print(f"ERROR initializing camera: {e}")
         return False
 
-def process_frame():
-    """Process video frames continuously."""
-    global cap, game_state, thread_alive, thread_errors
+def tracked_hand_box():
+    """The ROI tracker's hand box in unmirrored camera coordinates, or None."""
+    box = detector.roi_tracker.box if detector is not None and detector.roi_tracker else None
+    if box is None:
+        return None
+    # The tracker works on the mirrored frame; the motion gate runs before the flip
+    x0, y0, x1, y1 = box
+    return 1.0 - x1, y0, 1.0 - x0, y1
+
+def capture_frame():
+    """Capture stage: read and mirror the next camera frame on its deadline."""
+    if cap is None:
+        time.sleep(0.1)
+        return None
     
-    frame_count = 0
-    frame_skip = 0  # Skip frames for better performance
-    thread_alive = True
+    # Skip frame slots when downstream stages cannot keep up
+    if pipeline is not None:
+        scheduler.observe(pipeline.bottleneck_latency())
+    scheduler.wait()
     
-    print("Frame processing thread started")
+    start = time.perf_counter()
+    success, frame = cap.read()
+    if not success:
+        time.sleep(0.1)
+        return None
     
-    while thread_alive:
-        try:
-            if cap is None:
-                time.sleep(0.1)
-                continue
-            
-            success, frame = cap.read()
-            if not success:
-                time.sleep(0.1)
-                continue
-            
-            # Skip frames for performance
-            frame_skip += 1
-            if frame_skip % 2 == 0:
-                continue
-            
-            try:
-                frame = cv2.flip(frame, 1)
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            except Exception as e:
-                print(f"ERROR: Frame conversion failed: {e}")
-                thread_errors.append(str(e))
-                time.sleep(0.05)
-                continue
-            
-            # Process hand detection with timeout
-            try:
-                results = hands.process(rgb_frame)
-            except Exception as e:
-                print(f"ERROR in hand detection: {e}")
-                thread_errors.append(f"Hand detection: {e}")
-                time.sleep(0.05)
-                continue
-            
-            total_fingers = 0
-            all_extended = []
-            palm_facing = False
-            
-            if results.multi_hand_landmarks:
-                try:
-                    for hand_landmarks in results.multi_hand_landmarks:
-                        try:
-                            count, extended, palm = count_extended_fingers(hand_landmarks)
-                            total_fingers += count
-                            all_extended.extend(extended)
-                            palm_facing = palm
-                            
-                            # Draw hand skeleton
-                            mp_drawing.draw_landmarks(
-                                frame,
-                                hand_landmarks,
-                                mp_hands.HAND_CONNECTIONS,
-                                mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
-                                mp_drawing.DrawingSpec(color=(255, 0, 0), thickness=2)
-                            )
-                        except Exception as e:
-                            print(f"ERROR processing individual hand: {e}")
-                            thread_errors.append(f"Hand processing: {e}")
-                            continue
-                except Exception as e:
-                    print(f"ERROR in hand landmarks loop: {e}")
-                    thread_errors.append(f"Landmarks loop: {e}")
-                    continue
-            
-            # Encode frame to base64 with quality reduction
-            frame_data = None
-            try:
-                _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 70])
-                if buffer is not None:
-                    frame_data = base64.b64encode(buffer).decode('utf-8')
-            except Exception as e:
-                print(f"ERROR encoding frame: {e}")
-                thread_errors.append(f"Encoding: {e}")
-                frame_data = None
-            
-            # Update game state (quick lock to prevent blocking)
-            try:
-                if lock.acquire(timeout=0.5):
-                    try:
-                        game_state['finger_count'] = total_fingers
-                        game_state['extended_fingers'] = all_extended
-                        game_state['palm_facing'] = palm_facing
-                        game_state['frame_timestamp'] = time.time()
-                        if frame_data:
-                            game_state['frame_data'] = frame_data
-                    finally:
-                        lock.release()
-                else:
-                    print("WARNING: Could not acquire lock in time")
-            except Exception as e:
-                print(f"ERROR updating game state: {e}")
-                thread_errors.append(f"Game state: {e}")
-            
-            frame_count += 1
-            
-            # Rate limiting
-            try:
-                time.sleep(1.0 / FPS_TARGET)
-            except:
-                pass
-            
-        except Exception as e:
-            print(f"ERROR in main frame loop: {e}")
-            print(traceback.format_exc())
-            thread_errors.append(f"Main loop: {e}")
-            time.sleep(0.1)
+    # Latency is measured from the grab, so time spent waiting in the driver counts
+    captured_at = cap.frame_grabbed_at
     
-    print("Frame processing thread stopped")
-    thread_alive = False
+    # Nothing moved: keep the last landmarks and JPEG instead of reprocessing.
+    # Frames keep flowing until the smoothed count has caught up with a pose
+    # reached at the end of a motion
+    if motion_gate is not None and not motion_gate.changed(frame, tracked_hand_box(), force=not detector.settled()):
+        return None
+    
+    frame = cv2.flip(frame, 1)
+    metrics.observe('capture', time.perf_counter() - start)
+    return captured_at, frame
+
+def detect_hands(item):
+    """Inference stage: run hand detection and classify every hand."""
+    captured_at, frame = item
+    multi_hand_landmarks, finger_state = detector.detect(frame)
+    if recorder is not None:
+        recorder.write(time.time(), detector.last_points)
+    return captured_at, frame, multi_hand_landmarks, finger_state
+
+def annotate(frame, multi_hand_landmarks):
+    """Draw hand skeletons, logging instead of failing the frame."""
+    start = time.perf_counter()
+    try:
+        draw_hands(frame, multi_hand_landmarks)
+        metrics.observe('draw', time.perf_counter() - start)
+    except Exception as e:
+        print(f"ERROR drawing hand: {e}")
+        thread_errors.append(f"Hand drawing: {e}")
+
+def annotate_and_encode(item):
+    """Encode stage: annotate and encode the frame for viewers and publish the game state."""
+    captured_at, frame, multi_hand_landmarks, (total_fingers, all_extended, palm_facing) = item
+    
+    # Drawing and JPEG encoding are deferred until a viewer asks for the frame
+    previous = published.latest()
+    draw = (lambda img: annotate(img, multi_hand_landmarks)) if multi_hand_landmarks else None
+    encoded = None
+    try:
+        encoded = encoder.wrap(previous.frame_seq + 1, frame, draw)
+    except Exception as e:
+        print(f"ERROR encoding frame: {e}")
+        thread_errors.append(f"Encoding: {e}")
+    
+    # Publish a new snapshot; readers pick it up without locking
+    start = time.perf_counter()
+    state_seq = previous.state_seq
+    if not previous.same_state(total_fingers, all_extended, palm_facing):
+        state_seq += 1
+    published.publish(StateSnapshot(
+        frame_seq=encoded.seq if encoded else previous.frame_seq,
+        state_seq=state_seq,
+        finger_count=total_fingers,
+        extended_fingers=all_extended,
+        palm_facing=palm_facing,
+        timestamp=time.time(),
+        frame=encoded or previous.frame
+    ))
+    metrics.observe('publish', time.perf_counter() - start)
+    if 'first_frame' not in startup_phases:
+        startup_phases['first_frame'] = time.perf_counter() - processing_started_at
+        print(f"First frame published {startup_phases['first_frame']:.2f}s after start; ready for traffic")
+    
+    scheduler.frame_done(time.perf_counter() - captured_at)
+    return True
+
+# Start background pipeline for frame processing
+def warm_up_detector():
+    """Pay MediaPipe's graph setup and first-inference cost before any real frame."""
+    global warmed_up
+    seconds = detector.warm_up(shape=(720, 1280, 3))
+    startup_phases['warm_up'] = seconds
+    warmed_up = True
+    print(f"Detector warmed up in {seconds:.2f}s")
 
-# Start background thread for frame processing
 def start_processing():
-    global process_thread
+    global pipeline, thread_alive, recorder, processing_started_at
+    processing_started_at = time.perf_counter()
+    warm_up_detector()
+    phase_start = time.perf_counter()
     if not init_camera():
         print("ERROR: Failed to initialize camera")
         return False
-    process_thread = threading.Thread(target=process_frame, daemon=True, name="FrameProcessor")
-    process_thread.start()
-    print("Frame processing thread started")
+    startup_phases['camera_open'] = time.perf_counter() - phase_start
+    if RECORD_LANDMARKS:
+        recorder = LandmarkRecorder(RECORD_LANDMARKS)
+        # Finalize on any interpreter exit, not only Ctrl+C; after a hard crash
+        # `python landmark_recording.py recover` rebuilds it from the journal
+        atexit.register(stop_processing)
+        print(f"Recording landmarks to {RECORD_LANDMARKS}")
+    pipeline = FramePipeline(
+        ('capture', capture_frame),
+        ('inference', detect_hands),
+        ('encode', annotate_and_encode),
+        queue_size=PIPELINE_QUEUE_SIZE,
+        errors=thread_errors
+    )
+    pipeline.start()
+    thread_alive = True
+    print("Frame processing pipeline started")
     return True
-    thread.start()
+
+def stop_processing():
+    global thread_alive, recorder
+    thread_alive = False
+    if pipeline:
+        # Joins the stage threads, so no frame is still being recorded below
+        pipeline.stop()
+    if recorder is not None:
+        closing, recorder = recorder, None
+        closing.close()
+
+def stream_recording_path(stream_id):
+    """RECORD_LANDMARKS for a single stream; with STREAMS each stream gets its own file."""
+    if not RECORD_LANDMARKS or not STREAMS:
+        return RECORD_LANDMARKS
+    root, ext = os.path.splitext(RECORD_LANDMARKS)
+    return f'{root}-{stream_id}{ext}'
+
+def start_streams():
+    """Start capture and detector processes for every configured stream.
+    
+    With INFERENCE_PROCESS and no STREAMS, the camera runs as a single 'main'
+    stream that publishes into the global snapshot publisher, so this process
+    only serves the latest result through the usual routes. Workers apply the
+    same latency budget, motion gate and landmark recording settings as the
+    in-process pipeline.
+    """
+    global thread_alive, processing_started_at
+    processing_started_at = time.perf_counter()
+    configured = parse_streams(STREAMS) if STREAMS else [('main', camera_source())]
+    for stream_id, source in configured:
+        worker = StreamProcess(stream_id, source, published=None if STREAMS else published,
+                               observe=metrics.observe, ring_slots=RING_SLOTS, fps=FPS_TARGET, roi_tracking=ROI_TRACKING,
+                               smoothing=SMOOTHING, encode_budget_ms=ENCODE_BUDGET_MS,
+                               latency_budget_ms=LATENCY_BUDGET_MS, motion_threshold=MOTION_THRESHOLD,
+                               motion_pixel_threshold=MOTION_PIXEL_THRESHOLD,
+                               record_landmarks=stream_recording_path(stream_id))
+        worker.start()
+        streams[stream_id] = worker
+        print(f"Stream '{stream_id}' started (pid {worker.process.pid})")
+    thread_alive = bool(streams)
+    return thread_alive
+
+def processing_alive():
+    """True while the in-process pipeline or every stream worker is running."""
+    if streams:
+        return thread_alive and all(worker.is_alive() for worker in streams.values())
+    return thread_alive and pipeline is not None and pipeline.is_alive()
+
+def readiness_checks():
+    """Conditions that must all hold before this instance should receive traffic."""
+    if streams:
+        return {
+            'processing': processing_alive(),
+            'streams_ready': all(worker.ready() for worker in streams.values())
+        }
+    return {
+        'warmed_up': warmed_up,
+        'processing': processing_alive(),
+        'first_frame': published.latest().frame_seq > 0
+    }
+
+def startup_report():
+    """Startup phase durations in seconds; worker modes report each stream's time to first result."""
+    phases = {name: round(seconds, 3) for name, seconds in startup_phases.items()}
+    for stream_id, worker in streams.items():
+        if worker.first_result is not None:
+            phases[f'first_result[{stream_id}]'] = round(worker.first_result, 3)
+    return phases
+
+def stop_streams():
+    global thread_alive
+    thread_alive = False
+    for worker in streams.values():
+        worker.close()
+    streams.clear()
 
 # Routes
+@app.before_request
+def count_request():
+    metrics.count_request(request.endpoint or 'unmatched')
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
-@app.route('/api/frame')
-def get_frame():
-    """Get current frame as base64 image."""
+def long_poll_timeout():
+    """Read the long-poll timeout from the query string, capped at LONG_POLL_MAX."""
+    timeout = request.args.get('timeout', default=LONG_POLL_DEFAULT, type=float)
+    return max(0.0, min(timeout, LONG_POLL_MAX))
+
+def json_response(body, tag=None):
+    """Wrap already-serialized JSON bytes in a response, skipping jsonify."""
+    response = Response(body, mimetype='application/json')
+    if tag:
+        response.set_etag(tag)
+    return response
+
+def not_modified(tag):
+    """Empty 304 response carrying the current ETag."""
+    response = Response(status=304)
+    response.set_etag(tag)
+    return response
+
+def frame_response(publisher):
+    """Current frame of a publisher as JSON, honouring If-None-Match and ?after long polls."""
+    after = request.args.get('after', type=int)
     try:
-        with lock:
-            if game_state['frame_data']:
-                return jsonify({
-                    'image': game_state['frame_data'],
-                    'finger_count': game_state['finger_count'],
-                    'extended_fingers': game_state['extended_fingers'],
-                    'palm_facing': game_state['palm_facing'],
-                    'timestamp': game_state['frame_timestamp']
-                })
+        snapshot = publisher.latest()
+        if after is not None:
+            snapshot = publisher.wait_for(lambda snap: snap.frame_seq > after, long_poll_timeout())
+        if snapshot.frame:
+            tag = f"frame-{snapshot.frame_seq}"
+            if request.if_none_match.contains(tag) or (after is not None and snapshot.frame_seq <= after):
+                return not_modified(tag)
+            return json_response(snapshot.frame_json(), tag)
     except Exception as e:
         print(f"Error in get_frame: {e}")
     
     return jsonify({'error': 'No frame available'}), 503
 
+def status_response(publisher):
+    """Current finger state of a publisher, honouring If-None-Match and ?after long polls."""
+    after = request.args.get('after', type=int)
+    snapshot = publisher.latest()
+    if after is not None:
+        snapshot = publisher.wait_for(lambda snap: snap.state_seq > after, long_poll_timeout())
+    tag = f"state-{snapshot.state_seq}"
+    if request.if_none_match.contains(tag) or (after is not None and snapshot.state_seq <= after):
+        return not_modified(tag)
+    return json_response(snapshot.status_json, tag)
+
+def streams_conflict():
+    """409 from an unscoped route when STREAMS is set; each stream has its own routes."""
+    return jsonify({
+        'error': 'Several streams are configured; use /api/streams/<id>/...',
+        'streams': sorted(streams)
+    }), 409
+
+def mjpeg_response(frames):
+    return Response(
+        frames,
+        mimetype='multipart/x-mixed-replace; boundary=frame',
+        headers={'Cache-Control': 'no-cache, no-store', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/frame')
+def get_frame():
+    """Get current frame as base64 image.
+    
+    Supports If-None-Match on the frame sequence number and long polling
+    with ?after=<seq>&timeout=<seconds>.
+    """
+    if STREAMS:
+        return streams_conflict()
+    encoder.touch()
+    return frame_response(published)
+
+def generate_mjpeg(rung=None, publisher=published, running=lambda: thread_alive, viewers=encoder):
+    """Yield each newly published JPEG as one multipart chunk."""
+    last_seq = -1
+    if viewers is not None:
+        viewers.open_viewer()
+    try:
+        while running():
+            snapshot = publisher.wait_for(lambda snap: snap.frame_seq != last_seq, 1.0)
+            encoded = snapshot.frame
+            if encoded is None or encoded.seq == last_seq:
+                continue
+            last_seq = encoded.seq
+            # Shared across viewers: each rung is encoded at most once per frame
+            frame_jpeg = encoded.jpeg(rung)
+            yield (b'--frame\r\n'
+                   b'Content-Type: image/jpeg\r\n'
+                   b'Content-Length: ' + str(len(frame_jpeg)).encode() + b'\r\n\r\n' +
+                   frame_jpeg + b'\r\n')
+    finally:
+        if viewers is not None:
+            viewers.close_viewer()
+
+@app.route('/api/stream')
+def stream():
+    """Stream annotated frames as MJPEG (multipart/x-mixed-replace).
+    
+    ?rung=<n> pins a quality ladder rung; by default the encoder picks one.
+    """
+    if STREAMS:
+        return streams_conflict()
+    return mjpeg_response(generate_mjpeg(request.args.get('rung', type=int)))
+
 @app.route('/api/status')
 def get_status():
-    """Get current game state."""
-    with lock:
-        return jsonify({
-            'finger_count': game_state['finger_count'],
-            'extended_fingers': game_state['extended_fingers'],
-            'palm_facing': game_state['palm_facing']
-        })
+    """Get current game state.
+    
+    Supports If-None-Match on the state sequence number and long polling
+    with ?after=<seq>&timeout=<seconds>.
+    """
+    if STREAMS:
+        return streams_conflict()
+    return status_response(published)
 
-@app.route('/api/health')
-def health():
-    """Health check endpoint."""
+def get_stream_worker(stream_id):
+    worker = streams.get(stream_id)
+    if worker is None:
+        abort(404)
+    return worker
+
+@app.route('/api/streams')
+def list_streams():
+    """Configured streams with their worker state and current finger state."""
     return jsonify({
-        'status': 'healthy',
-        'camera': cap is not None and cap.isOpened(),
-        'thread_alive': thread_alive,
-        'frame_data_available': game_state['frame_data'] is not None,
-        'recent_errors': thread_errors[-5:] if thread_errors else []
+        stream_id: dict(worker.stats(), state=worker.published.latest().status())
+        for stream_id, worker in streams.items()
     })
 
+@app.route('/api/streams/<stream_id>/frame')
+def get_stream_frame(stream_id):
+    """Like /api/frame, for one stream."""
+    return frame_response(get_stream_worker(stream_id).published)
+
+@app.route('/api/streams/<stream_id>/status')
+def get_stream_status(stream_id):
+    """Like /api/status, for one stream."""
+    return status_response(get_stream_worker(stream_id).published)
+
+@app.route('/api/streams/<stream_id>/stream')
+def stream_stream(stream_id):
+    """Like /api/stream, for one stream. The worker picks the JPEG quality."""
+    worker = get_stream_worker(stream_id)
+    return mjpeg_response(generate_mjpeg(publisher=worker.published, running=worker.is_alive, viewers=None))
+
+def state_message(snapshot):
+    """Format a snapshot's finger state as one SSE message."""
+    return f"id: {snapshot.state_seq}\nevent: state\ndata: {snapshot.status_json.decode('utf-8')}\n\n"
+
+def generate_events(last_seq, publisher=published, running=lambda: thread_alive):
+    """Yield a message whenever the finger state changes, with periodic heartbeats."""
+    yield "retry: 1000\n\n"
+    while running():
+        snapshot = publisher.wait_for(lambda snap: snap.state_seq != last_seq, SSE_HEARTBEAT)
+        if snapshot.state_seq != last_seq:
+            last_seq = snapshot.state_seq
+            yield state_message(snapshot)
+        else:
+            yield ": heartbeat\n\n"
+
+def events_response(publisher=published, running=lambda: thread_alive):
+    # Resuming clients get the current state only if they missed something
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    last_seq = int(last_event_id) if last_event_id.isdigit() else -1
+    return Response(
+        generate_events(last_seq, publisher, running),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/events')
+def events():
+    """Push finger-count state changes as Server-Sent Events."""
+    if STREAMS:
+        return streams_conflict()
+    return events_response()
+
+@app.route('/api/streams/<stream_id>/events')
+def stream_events(stream_id):
+    """Like /api/events, for one stream."""
+    worker = get_stream_worker(stream_id)
+    return events_response(worker.published, worker.is_alive)
+
+@app.route('/api/ready')
+def ready():
+    """Readiness check, separate from /api/health (liveness).
+    
+    Returns 503 until the detector is warmed up and processed frames are
+    being published, so load balancers only route to instances at full speed.
+    """
+    checks = readiness_checks()
+    is_ready = all(checks.values())
+    body = json.dumps({'ready': is_ready, 'checks': checks, 'startup': startup_report()}).encode('utf-8')
+    return Response(body, status=200 if is_ready else 503, mimetype='application/json')
+
+@app.route('/api/health')
+def health():
+    """Liveness check endpoint; see /api/ready for readiness."""
+    global health_cache
+    now = time.monotonic()
+    cached_at, body = health_cache
+    if body is None or now - cached_at > HEALTH_CACHE_TTL:
+        body = json.dumps({
+            'status': 'healthy',
+            'camera': cap is not None and cap.isOpened(),
+            'capture': cap.stats() if cap is not None else None,
+            'thread_alive': processing_alive(),
+            'stages': pipeline.stats() if pipeline else {},
+            # Worker modes schedule, gate and encode in the stream processes; see 'streams'
+            'scheduler': scheduler.stats() if not streams else None,
+            'detector': detector.stats() if detector else None,
+            'motion': motion_gate.stats() if motion_gate and not streams else None,
+            'frame_data_available': published.latest().frame is not None,
+            'encoder': encoder.stats() if not streams else None,
+            'streams': {stream_id: worker.stats() for stream_id, worker in streams.items()},
+            'recent_errors': thread_errors[-5:] if thread_errors else []
+        }).encode('utf-8')
+        health_cache = (now, body)
+    return json_response(body)
+
+def pipeline_metrics():
+    """Queue, drop and error counters as extra metric families for StageMetrics.render."""
+    stages = pipeline.stats() if pipeline else {}
+    depths = [((('queue', name),), entry['queue_depth']) for name, entry in stages.items() if 'queue_depth' in entry]
+    dropped = [((('reason', 'queue_full'), ('stage', name)), entry['dropped'])
+               for name, entry in stages.items() if 'dropped' in entry]
+    if motion_gate is not None and not streams:
+        dropped.append(((('reason', 'no_motion'), ('stage', 'capture')), motion_gate.skipped))
+    return [
+        ('queue_depth', 'gauge', 'Frames waiting in the queue after each stage.', depths),
+        ('dropped_frames_total', 'counter', 'Frames dropped before reaching the next stage.', dropped),
+        ('stage_frames_total', 'counter', 'Frames completed by each pipeline stage.',
+         [((('stage', name),), entry['processed']) for name, entry in stages.items()]),
+        ('stage_errors_total', 'counter', 'Exceptions raised by each pipeline stage.',
+         [((('stage', name),), entry['errors']) for name, entry in stages.items()]),
+        ('frame_age_seconds', 'gauge', 'Age of the newest camera frame when the capture stage took it.',
+         [((), cap.frame_age if cap is not None else 0.0)]),
+        ('late_frames_total', 'counter', 'Frames that missed their scheduler deadline.',
+         [((), scheduler.late_frames)]),
+        ('viewers', 'gauge', 'Clients currently watching the frame stream.', [((), encoder.viewers())]),
+        ('stream_up', 'gauge', 'Whether each stream worker process is running.',
+         [((('stream', stream_id),), int(worker.is_alive())) for stream_id, worker in streams.items()]),
+        ('stream_latency_seconds', 'gauge', 'Capture-to-publish latency of the newest frame per stream.',
+         [((('stream', stream_id),), worker.latency_ms / 1000.0) for stream_id, worker in streams.items()]),
+        ('ready', 'gauge', 'Whether this instance passes its readiness checks.',
+         [((), int(all(readiness_checks().values())))]),
+        ('startup_phase_seconds', 'gauge', 'Time spent in each startup phase.',
+         [((('phase', phase),), seconds) for phase, seconds in startup_report().items()]),
+        ('pipeline_up', 'gauge', 'Whether every pipeline stage thread or stream worker is running.',
+         [((), int(processing_alive()))])
+    ]
+
+@app.route('/api/metrics')
+def get_metrics():
+    """Per-stage latency histograms, queue depths, drops and request counts in Prometheus text format."""
+    return Response(metrics.render(pipeline_metrics()), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @app.route('/favicon.ico')
 def favicon():
     """Serve a simple favicon to prevent 404 errors."""
@@ -318,11 +590,19 @@ if __name__ == '__main__':
     print("Starting Finger Detection Backend...")
     print("="*60)
     print(f"Target FPS: {FPS_TARGET}")
+    print(f"Latency budget: {f'{LATENCY_BUDGET_MS:.0f} ms' if LATENCY_BUDGET_MS else 'none'}")
     print(f"Max hands: 2")
     print(f"Detection confidence: 0.7")
+    if STREAMS:
+        print(f"Streams: {', '.join(f'{name}={source}' for name, source in parse_streams(STREAMS))}")
+    elif INFERENCE_PROCESS:
+        print("Inference: separate process")
     print("="*60 + "\n")
     
-    if start_processing():
+    use_workers = bool(STREAMS) or INFERENCE_PROCESS
+    # Turn SIGTERM into a normal exit so atexit handlers finalize the recording
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    if start_streams() if use_workers else start_processing():
         try:
             print("Starting Flask server on http://0.0.0.0:5000")
             print("Open browser at: http://localhost:5000")
@@ -330,7 +610,10 @@ if __name__ == '__main__':
             app.run(debug=False, host='0.0.0.0', port=5000, threaded=True, use_reloader=False)
         except KeyboardInterrupt:
             print("\n\nShutting down...")
-            thread_alive = False
+            if use_workers:
+                stop_streams()
+            else:
+                stop_processing()
             if cap:
                 cap.release()
             print("Cleanup complete")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""
+Batch annotation of many recordings in parallel
+- Shards a directory of videos across a process pool
+- Each worker owns one HandDetector (one MediaPipe instance) for its lifetime
+- Streams per-frame results to one JSON lines file per recording
+- Reports aggregate frames per second
+
+Usage:
+    python batch_annotate.py sessions/ -o results/ --workers 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+VIDEO_EXTENSIONS = {'.mp4', '.avi', '.mov', '.mkv', '.webm', '.m4v'}
+
+# Per-process detector, created by _init_worker
+_detector = None
+
+
+def find_recordings(root):
+    """Every video file under root, largest first so long files start early."""
+    root = Path(root)
+    if root.is_file():
+        return [root]
+    videos = [p for p in root.rglob('*') if p.is_file() and p.suffix.lower() in VIDEO_EXTENSIONS]
+    return sorted(videos, key=lambda p: p.stat().st_size, reverse=True)
+
+
+def output_path(video, root, out_dir):
+    root = Path(root)
+    relative = video.relative_to(root) if root.is_dir() else Path(video.name)
+    return Path(out_dir) / relative.with_suffix('.jsonl')
+
+
+def _init_worker(detector_options):
+    global _detector
+    from hand_detector import HandDetector
+    _detector = HandDetector(**detector_options)
+
+
+def _annotate(task):
+    """Annotate one recording in a worker; returns (video, frames, seconds, error)."""
+    from replay import replay
+
+    video, target, flip = task
+    _detector.reset()
+    target.parent.mkdir(parents=True, exist_ok=True)
+    partial = target.with_suffix('.jsonl.partial')
+    try:
+        with open(partial, 'w') as out:
+            frames, seconds = replay(video, out, _detector, flip=flip)
+        os.replace(partial, target)
+        return str(video), frames, seconds, None
+    except Exception as e:
+        return str(video), 0, 0.0, str(e)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Annotate a directory of recordings in parallel.')
+    parser.add_argument('root', help='Directory of recordings (searched recursively) or a single file')
+    parser.add_argument('-o', '--output', required=True, help='Directory for per-recording JSON lines files')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+    parser.add_argument('--skip-existing', action='store_true', help='Skip recordings that already have results')
+    parser.add_argument('--no-flip', action='store_true', help='Do not mirror frames like the live camera')
+    parser.add_argument('--no-roi', action='store_true', help='Disable region-of-interest tracking')
+    parser.add_argument('--no-smoothing', action='store_true', help='Report raw per-frame counts')
+    parser.add_argument('--summary', help='Write a JSON summary of the run to this file')
+    args = parser.parse_args(argv)
+
+    videos = find_recordings(args.root)
+    tasks = []
+    for video in videos:
+        target = output_path(video, args.root, args.output)
+        if args.skip_existing and target.exists():
+            continue
+        tasks.append((video, target, not args.no_flip))
+    if not tasks:
+        print("Nothing to do", file=sys.stderr)
+        return 0
+
+    detector_options = {'roi_tracking': not args.no_roi, 'smoothing': not args.no_smoothing}
+    workers = max(1, min(args.workers, len(tasks)))
+    print(f"Annotating {len(tasks)} recordings with {workers} workers", file=sys.stderr)
+
+    total_frames = 0
+    failures = []
+    start = time.perf_counter()
+    with Pool(workers, initializer=_init_worker, initargs=(detector_options,)) as pool:
+        for done, (video, frames, seconds, error) in enumerate(pool.imap_unordered(_annotate, tasks), 1):
+            elapsed = time.perf_counter() - start
+            if error:
+                failures.append({'video': video, 'error': error})
+                print(f"[{done}/{len(tasks)}] FAILED {video}: {error}", file=sys.stderr)
+                continue
+            total_frames += frames
+            file_fps = frames / seconds if seconds else 0.0
+            print(f"[{done}/{len(tasks)}] {video}: {frames} frames ({file_fps:.1f} FPS), "
+                  f"aggregate {total_frames / elapsed:.1f} FPS", file=sys.stderr)
+    wall = time.perf_counter() - start
+
+    summary = {
+        'recordings': len(tasks),
+        'failed': len(failures),
+        'frames': total_frames,
+        'seconds': round(wall, 3),
+        'fps': round(total_frames / wall, 2) if wall else 0.0,
+        'workers': workers,
+        'failures': failures
+    }
+    print(f"Done: {total_frames} frames in {wall:.1f}s ({summary['fps']} FPS aggregate), "
+          f"{len(failures)} failed", file=sys.stderr)
+    if args.summary:
+        with open(args.summary, 'w') as f:
+            json.dump(summary, f, indent=2)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
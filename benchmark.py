@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+"""
+Benchmark suite for the finger counter
+- Landmark classifiers on synthetic or recorded landmark fixtures
+- Per-frame image stages (flip, cvtColor, imencode) on a synthetic camera frame
+- Flask endpoints of app_heavy through the test client
+- Reports throughput and p50/p99 latency per case
+- Compares against a stored baseline and exits non-zero on regressions
+
+Usage:
+    python benchmark.py --save-baseline            # record bench_baseline.json on this machine
+    python benchmark.py                            # compare against it
+    python benchmark.py --recording session.flm --only landmarks
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+import landmark_engine
+from landmark_engine import NUM_LANDMARKS
+
+DEFAULT_BASELINE = 'bench_baseline.json'
+GROUPS = ('landmarks', 'frame', 'endpoints')
+FRAME_SHAPE = (720, 1280, 3)
+
+
+# Fixtures
+
+def synthetic_points(n_hands=256, seed=0):
+    """Plausible-looking hands: a wrist plus five jittered finger chains, shape (n, 21, 3)."""
+    rng = np.random.default_rng(seed)
+    points = np.empty((n_hands, NUM_LANDMARKS, 3), dtype=np.float32)
+    wrist = rng.uniform(0.3, 0.7, size=(n_hands, 3))
+    wrist[:, 2] = 0.0
+    points[:, 0] = wrist
+    for finger in range(5):
+        angle = np.pi * (0.15 + 0.175 * finger) + rng.normal(0, 0.05, n_hands)
+        direction = np.stack([np.cos(angle), -np.sin(angle), np.zeros(n_hands)], axis=1)
+        joint = wrist
+        for k in range(4):
+            # Random bend per joint so roughly half the fingers come out extended
+            bend = rng.uniform(-1.2, 1.2, n_hands)
+            rotated = np.stack([
+                direction[:, 0] * np.cos(bend) - direction[:, 1] * np.sin(bend),
+                direction[:, 0] * np.sin(bend) + direction[:, 1] * np.cos(bend),
+                rng.normal(0, 0.3, n_hands)
+            ], axis=1)
+            joint = joint + 0.04 * rotated
+            points[:, 1 + finger * 4 + k] = joint
+    return points
+
+
+def recorded_points(path, limit=4096):
+    """Hands from a landmark recording made by app_heavy or replay.py --record."""
+    from landmark_recording import LandmarkRecording
+    with LandmarkRecording(path) as recording:
+        points = np.array(recording.points[:limit])
+    if not len(points):
+        raise ValueError(f"{path} contains no hands")
+    return points
+
+
+def as_landmarks(points):
+    """Wrap an (n, 21, 3) array as MediaPipe-style hand_landmarks objects."""
+    return [
+        SimpleNamespace(landmark=[SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in hand])
+        for hand in points
+    ]
+
+
+def synthetic_frame(seed=0):
+    """A noisy 720p BGR frame; noise keeps JPEG sizes realistic rather than trivially small."""
+    rng = np.random.default_rng(seed)
+    frame = np.full(FRAME_SHAPE, 128, dtype=np.uint8)
+    frame += rng.integers(0, 32, size=FRAME_SHAPE, dtype=np.uint8)
+    return frame
+
+
+# Timing
+
+def measure(func, inputs, iterations, warmup=20):
+    """Call func on inputs round-robin; returns per-call latencies in seconds."""
+    n = len(inputs)
+    for i in range(min(warmup, iterations)):
+        func(inputs[i % n])
+    latencies = np.empty(iterations, dtype=np.float64)
+    clock = time.perf_counter
+    for i in range(iterations):
+        item = inputs[i % n]
+        t0 = clock()
+        func(item)
+        latencies[i] = clock() - t0
+    return latencies
+
+
+def summarize(latencies, items_per_call=1):
+    total = latencies.sum()
+    return {
+        'calls': len(latencies),
+        'throughput': round(len(latencies) * items_per_call / total, 1) if total else 0.0,
+        'p50_us': round(float(np.percentile(latencies, 50)) * 1e6, 2),
+        'p99_us': round(float(np.percentile(latencies, 99)) * 1e6, 2)
+    }
+
+
+# Benchmark groups; each returns {case: summary} or raises ImportError when its dependencies are missing
+
+def bench_landmarks(points, iterations):
+    from app_heavy import count_extended_fingers, is_palm_facing_camera
+
+    hands = as_landmarks(points)
+    results = {
+        'count_extended_fingers': summarize(measure(count_extended_fingers, hands, iterations)),
+        'is_palm_facing_camera': summarize(measure(is_palm_facing_camera, hands, iterations)),
+        'landmarks_to_array': summarize(measure(lambda h: landmark_engine.landmarks_to_array([h]), hands, iterations))
+    }
+    # Whole fixture in one vectorized call, as landmark recordings are classified
+    batch = summarize(measure(landmark_engine.classify_hands, [points], max(10, iterations // 100)), len(points))
+    results[f'classify_hands[{len(points)}]'] = batch
+
+    try:
+        from maze import KidsHandGame
+    except ImportError as e:
+        print(f"  skipping KidsHandGame.count_fingers: {e}", file=sys.stderr)
+    else:
+        # count_fingers uses no game state, so skip the pygame/camera setup in __init__
+        game = KidsHandGame.__new__(KidsHandGame)
+        results['KidsHandGame.count_fingers'] = summarize(measure(game.count_fingers, hands, iterations))
+    return results
+
+
+def bench_frame(iterations):
+    import cv2
+
+    frame = synthetic_frame()
+    mirrored = cv2.flip(frame, 1)
+    encode_params = [cv2.IMWRITE_JPEG_QUALITY, 80]
+    iterations = max(10, iterations // 10)
+    return {
+        'flip': summarize(measure(lambda f: cv2.flip(f, 1), [frame], iterations)),
+        'cvtColor': summarize(measure(lambda f: cv2.cvtColor(f, cv2.COLOR_BGR2RGB), [mirrored], iterations)),
+        'imencode': summarize(measure(lambda f: cv2.imencode('.jpg', f, encode_params), [mirrored], iterations))
+    }
+
+
+def bench_endpoints(iterations):
+    import app_heavy
+    from state_snapshot import StateSnapshot
+
+    # Publish one frame as the processing pipeline would, without opening a camera
+    encoded = app_heavy.encoder.wrap(1, synthetic_frame())
+    app_heavy.published.publish(StateSnapshot(
+        frame_seq=1, state_seq=1, finger_count=3, extended_fingers=['Index', 'Middle', 'Ring'],
+        palm_facing=True, timestamp=time.time(), frame=encoded
+    ))
+    client = app_heavy.app.test_client()
+
+    def get(path, headers=None):
+        def request(_):
+            response = client.get(path, headers=headers)
+            response.get_data()
+            if response.status_code not in (200, 304):
+                raise RuntimeError(f"GET {path} returned {response.status_code}")
+        return request
+
+    iterations = max(10, iterations // 10)
+    return {
+        'GET /api/status': summarize(measure(get('/api/status'), [None], iterations)),
+        'GET /api/status (304)': summarize(measure(get('/api/status', {'If-None-Match': '"state-1"'}), [None], iterations)),
+        'GET /api/frame': summarize(measure(get('/api/frame'), [None], iterations)),
+        'GET /api/health': summarize(measure(get('/api/health'), [None], iterations))
+    }
+
+
+# Baseline comparison
+
+def compare(results, baseline, tolerance):
+    """Return a list of regression messages for cases slower than baseline by more than tolerance."""
+    regressions = []
+    for group, cases in results.items():
+        for case, current in cases.items():
+            previous = baseline.get(group, {}).get(case)
+            if previous is None:
+                continue
+            for metric in ('p50_us', 'p99_us'):
+                # p99 is noisier, so it gets twice the slack
+                allowed = previous[metric] * (1 + tolerance * (2 if metric == 'p99_us' else 1))
+                if current[metric] > allowed:
+                    regressions.append(f"{group}/{case}: {metric} {current[metric]} > {previous[metric]} "
+                                       f"(+{(current[metric] / previous[metric] - 1) * 100:.0f}%)")
+    return regressions
+
+
+def print_results(results, baseline):
+    print(f"{'case':<40} {'throughput/s':>14} {'p50 us':>10} {'p99 us':>10} {'vs base':>8}")
+    for group, cases in results.items():
+        print(f"[{group}]")
+        for case, r in cases.items():
+            previous = baseline.get(group, {}).get(case) if baseline else None
+            delta = f"{(r['p50_us'] / previous['p50_us'] - 1) * 100:+.0f}%" if previous and previous['p50_us'] else ''
+            print(f"  {case:<38} {r['throughput']:>14,.1f} {r['p50_us']:>10.2f} {r['p99_us']:>10.2f} {delta:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark classifiers, frame stages and endpoints.')
+    parser.add_argument('--only', choices=GROUPS, action='append', help='Run only these groups (repeatable)')
+    parser.add_argument('-n', '--iterations', type=int, default=5000, help='Calls per landmark case')
+    parser.add_argument('--recording', help='Use hands from a landmark recording instead of synthetic ones')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true', help='Write these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed p50 slowdown before failing')
+    parser.add_argument('-o', '--output', help='Also write results as JSON to this file')
+    args = parser.parse_args(argv)
+
+    points = recorded_points(args.recording) if args.recording else synthetic_points()
+    runners = {
+        'landmarks': lambda: bench_landmarks(points, args.iterations),
+        'frame': lambda: bench_frame(args.iterations),
+        'endpoints': lambda: bench_endpoints(args.iterations)
+    }
+
+    results = {}
+    for group in args.only or GROUPS:
+        print(f"Running {group}...", file=sys.stderr)
+        try:
+            results[group] = runners[group]()
+        except ImportError as e:
+            print(f"  skipping {group}: {e}", file=sys.stderr)
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f).get('results', {})
+
+    print_results(results, baseline)
+    report = {
+        'timestamp': time.time(),
+        'python': sys.version.split()[0],
+        'fixture': args.recording or 'synthetic',
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {args.baseline}", file=sys.stderr)
+        return 0
+    if not baseline:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one", file=sys.stderr)
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\nREGRESSIONS ({len(regressions)}):", file=sys.stderr)
+        for message in regressions:
+            print(f"  {message}", file=sys.stderr)
+        return 1
+    print("\nNo regressions against baseline", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Stale-frame-free camera capture
+- A drain thread keeps calling grab() so the driver buffer never backs up
+- Only the newest grabbed frame is decoded, when a consumer asks (retrieve)
+- Every frame carries its grab time, so consumers can see how old it is
+- Video files are paced at their own frame rate instead of being drained
+"""
+
+import os
+import threading
+import time
+
+import cv2
+
+
+class LatestFrameCapture:
+    """Drop-in for the read()/isOpened()/release() part of cv2.VideoCapture."""
+
+    def __init__(self, source=0, width=1280, height=720, fps=30):
+        self.source = source
+        self.cap = cv2.VideoCapture(source)
+        if self.cap.isOpened():
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+            self.cap.set(cv2.CAP_PROP_FPS, fps)
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        # Files would otherwise be drained as fast as the disk allows. Device
+        # paths such as /dev/video0 are not regular files and are drained like cameras
+        self.file_interval = None
+        if isinstance(source, str) and os.path.isfile(source):
+            file_fps = self.cap.get(cv2.CAP_PROP_FPS) if self.cap.isOpened() else 0
+            self.file_interval = 1.0 / (file_fps if file_fps and file_fps > 0 else fps)
+
+        self.grabbed_at = 0.0     # perf_counter() of the newest grab
+        self.frame_grabbed_at = 0.0  # perf_counter() grab time of the last frame returned by read()
+        self.frame_age = 0.0      # Age in seconds of that frame when read() returned it
+        self.grabbed = 0
+        self.retrieved = 0
+        self._seq = 0             # Grab sequence of the newest frame
+        self._read_seq = 0        # Grab sequence last returned by read()
+        self._readers = 0         # read() calls waiting to retrieve
+        self._cond = threading.Condition()
+        self._device = threading.Lock()  # VideoCapture is not safe to grab and retrieve concurrently
+        self._running = self.cap.isOpened()
+        self._thread = None
+        if self._running:
+            self._thread = threading.Thread(target=self._drain, daemon=True, name='capture-drain')
+            self._thread.start()
+
+    def _drain(self):
+        next_grab = time.perf_counter()
+        while self._running:
+            if self.file_interval:
+                delay = next_grab - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                next_grab += self.file_interval
+            with self._cond:
+                # A reader is about to decode the newest frame; grabbing now would replace it
+                self._cond.wait_for(lambda: not self._readers or not self._running)
+            # grab() blocks until the driver has a frame, so only the device lock is held
+            with self._device:
+                ok = self.cap.grab()
+                if ok:
+                    with self._cond:
+                        self.grabbed_at = time.perf_counter()
+                        self._seq += 1
+                        self.grabbed += 1
+                        self._cond.notify_all()
+            if not ok:
+                if self.file_interval:
+                    # End of file
+                    break
+                time.sleep(0.01)
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def read(self, timeout=1.0):
+        """Decode the newest frame not yet returned; returns (success, frame) like VideoCapture."""
+        with self._cond:
+            if self._seq == self._read_seq and self._running:
+                self._cond.wait_for(lambda: self._seq != self._read_seq or not self._running, timeout)
+            if self._seq == self._read_seq:
+                return False, None
+            self._readers += 1
+        ok, seq = False, None
+        try:
+            with self._device:
+                with self._cond:
+                    seq, grabbed_at = self._seq, self.grabbed_at
+                ok, frame = self.cap.retrieve()
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if ok:
+                    self._read_seq = seq
+                self._cond.notify_all()
+        if not ok:
+            return False, None
+        self.retrieved += 1
+        self.frame_grabbed_at = grabbed_at
+        self.frame_age = time.perf_counter() - grabbed_at
+        return True, frame
+
+    def isOpened(self):
+        return self._running
+
+    def release(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        self.cap.release()
+
+    def stats(self):
+        return {
+            'grabbed': self.grabbed,
+            'retrieved': self.retrieved,
+            'skipped': max(0, self.grabbed - self.retrieved),
+            'frame_age_ms': round(self.frame_age * 1000.0, 2)
+        }
@@ -0,0 +1,230 @@
+"""
+Hand detector worker pool
+- Runs MediaPipe hand detection in a pool of worker processes
+- Each worker owns its own Hands instance (they are not thread-safe)
+- Decodes uploaded JPEG/WebP/PNG frames or raw pixels and classifies fingers with landmark_engine
+- Concurrent requests are micro-batched, then split across the idle workers
+- A pool broken by a crashed worker is replaced on the next request
+- MediaPipe and OpenCV are optional: available() reports whether they are installed
+"""
+
+import importlib.util
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from micro_batch import MicroBatcher
+
+DETECTOR_WORKERS = int(os.environ.get('DETECTOR_WORKERS', os.cpu_count() or 1))
+DETECT_TIMEOUT = float(os.environ.get('DETECT_TIMEOUT', 5.0))  # Seconds to wait for one frame
+BATCH_WINDOW_MS = float(os.environ.get('BATCH_WINDOW_MS', 5))  # How long a batch stays open for more frames
+BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', 8))
+
+# Per-process detector, created by _init_worker
+_hands = None
+
+
+def available():
+    """True if OpenCV and MediaPipe can be imported in this environment."""
+    return all(importlib.util.find_spec(name) is not None for name in ('cv2', 'mediapipe'))
+
+
+def _init_worker(max_num_hands, min_detection_confidence):
+    """Create this worker's MediaPipe Hands instance."""
+    global _hands
+    import mediapipe as mp
+    # Frames come from many unrelated clients, so track nothing between calls
+    _hands = mp.solutions.hands.Hands(
+        static_image_mode=True,
+        max_num_hands=max_num_hands,
+        min_detection_confidence=min_detection_confidence
+    )
+
+
+def summarize_hands(counts, extended_mask, palms):
+    """Turn classifier output for one frame's hands into the response dict."""
+    import landmark_engine
+
+    if len(counts) == 0:
+        return {'finger_count': 0, 'extended_fingers': [], 'palm_facing': False, 'hands': 0}
+    extended = []
+    for row in extended_mask:
+        extended.extend(landmark_engine.extended_list(row))
+    return {
+        'finger_count': int(counts.sum()),
+        'extended_fingers': extended,
+        'palm_facing': bool(palms[-1]),
+        'hands': len(counts)
+    }
+
+
+def decode_encoded(image_bytes):
+    """Decode a compressed image into an RGB frame."""
+    import cv2
+    import numpy as np
+
+    frame = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if frame is None:
+        raise ValueError('Could not decode image')
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+def decode_raw(pixel_bytes, width, height, channels=3):
+    """View raw RGB/RGBA pixels as an RGB frame without copying them."""
+    import numpy as np
+
+    expected = width * height * channels
+    if len(pixel_bytes) != expected:
+        raise ValueError(f'Expected {expected} bytes for {width}x{height}x{channels}, got {len(pixel_bytes)}')
+    frame = np.frombuffer(pixel_bytes, dtype=np.uint8).reshape(height, width, channels)
+    if channels == 4:
+        frame = frame[:, :, :3]
+    # MediaPipe needs a contiguous array; this copies only when alpha was dropped
+    return np.ascontiguousarray(frame)
+
+
+def detect_batch(tasks):
+    """Decode and detect a batch of (decoder, args) frames in this worker.
+    
+    Landmarks from every frame are classified together in one pass. The
+    result list has one dict per task, or the exception that task raised.
+    """
+    import landmark_engine
+
+    results = [None] * len(tasks)
+    detected = []
+    for i, (decoder, args) in enumerate(tasks):
+        try:
+            rgb_frame = decoder(*args)
+            detected.append((i, _hands.process(rgb_frame).multi_hand_landmarks or []))
+        except Exception as e:
+            results[i] = e
+
+    all_hands = [hand for _, multi_hand_landmarks in detected for hand in multi_hand_landmarks]
+    if all_hands:
+        points = landmark_engine.landmarks_to_array(all_hands)
+        counts, extended_mask, palms = landmark_engine.classify_hands(points)
+
+    offset = 0
+    for i, multi_hand_landmarks in detected:
+        n = len(multi_hand_landmarks)
+        if n:
+            rows = slice(offset, offset + n)
+            results[i] = summarize_hands(counts[rows], extended_mask[rows], palms[rows])
+        else:
+            results[i] = summarize_hands([], [], [])
+        offset += n
+    return results
+
+
+class DetectorPool:
+    """Process pool where every worker holds one MediaPipe Hands instance."""
+
+    def __init__(self, workers=DETECTOR_WORKERS, max_num_hands=2, min_detection_confidence=0.7):
+        self.workers = workers
+        self.busy = 0  # Worker calls submitted and not yet finished
+        self.broken = False  # Set once a worker died; the executor refuses new work
+        self._busy_lock = threading.Lock()
+        # The pool is created lazily from a request thread; forking a multi-threaded
+        # process can deadlock, so workers start from a clean forkserver instead
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('forkserver'),
+            initializer=_init_worker,
+            initargs=(max_num_hands, min_detection_confidence)
+        )
+
+    def submit(self, func, *args):
+        try:
+            future = self.executor.submit(func, *args)
+        except BrokenProcessPool:
+            self.broken = True
+            raise
+        with self._busy_lock:
+            self.busy += 1
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future):
+        with self._busy_lock:
+            self.busy -= 1
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self.broken = True
+
+    def detect_many(self, tasks):
+        """Split a batch of (decoder, args) frames across the idle workers.
+
+        Returns one Future for the whole batch, resolving to a result list in task order.
+        """
+        idle = max(1, self.workers - self.busy)
+        size = math.ceil(len(tasks) / idle)
+        chunks = [self.submit(detect_batch, tasks[i:i + size]) for i in range(0, len(tasks), size)]
+        if len(chunks) == 1:
+            return chunks[0]
+
+        batch = Future()
+        remaining = [len(chunks)]
+        lock = threading.Lock()
+
+        def collect(_done):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            try:
+                batch.set_result([result for chunk in chunks for result in chunk.result()])
+            except Exception as e:
+                batch.set_exception(e)
+
+        for chunk in chunks:
+            chunk.add_done_callback(collect)
+        return batch
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the shared pool, creating it on first use (after any server fork).
+
+    A pool whose worker died is shut down and replaced.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool.broken:
+            print("Detector pool broken by a worker crash, restarting it")
+            _pool.shutdown()
+            _pool = None
+        if _pool is None:
+            _pool = DetectorPool()
+            print(f"Detector pool started with {_pool.workers} workers")
+        return _pool
+
+
+_batcher = None
+
+
+def _detect_many(tasks):
+    # Looked up per batch so batches go to the replacement after a pool restart
+    return get_pool().detect_many(tasks)
+
+
+def get_batcher():
+    """Return the shared micro-batcher feeding the detector pool."""
+    global _batcher
+    with _pool_lock:
+        if _batcher is None:
+            _batcher = MicroBatcher(_detect_many, BATCH_WINDOW_MS, BATCH_MAX_SIZE)
+        return _batcher
+
+
+def batcher_stats():
+    """Micro-batching counters, or None before the first batched request."""
+    return _batcher.stats() if _batcher is not None else None
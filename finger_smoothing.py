@@ -0,0 +1,128 @@
+"""
+Temporal smoothing for finger counts
+- Exponential moving average on each finger's joint-angle cosine
+- Hysteresis thresholds so fingers near the boundary do not flicker
+- k-of-n vote on the final count
+- A hand missed for a few frames keeps its last count instead of dropping the total
+- settled() tells callers (e.g. the motion gate) when more frames would change nothing
+- Constant work per hand per frame
+"""
+
+import numpy as np
+
+from landmark_engine import COS_THRESHOLD, NUM_FINGERS
+
+
+class CountVote:
+    """Report a count only once it wins k of the last n frames."""
+
+    def __init__(self, n=5, k=3, max_count=10):
+        self.n = n
+        self.k = k
+        self.history = [0] * n
+        self.tally = [0] * (max_count + 1)
+        self.tally[0] = n
+        self.pos = 0
+        self.value = 0
+
+    def update(self, count):
+        """Add one raw count and return the voted count."""
+        count = max(0, min(count, len(self.tally) - 1))
+        self.tally[self.history[self.pos]] -= 1
+        self.history[self.pos] = count
+        self.tally[count] += 1
+        self.pos = (self.pos + 1) % self.n
+        if self.tally[count] >= self.k:
+            self.value = count
+        return self.value
+
+    def settled(self):
+        """True once every frame in the window agrees with the voted count."""
+        return self.tally[self.value] == self.n
+
+    def reset(self, count=0):
+        self.history = [count] * self.n
+        self.tally = [0] * len(self.tally)
+        self.tally[count] = self.n
+        self.value = count
+
+
+class FingerFilter:
+    """Smoothed extended-finger state for one hand."""
+
+    def __init__(self, alpha=0.5, margin=0.05, n=5, k=3):
+        self.alpha = alpha                          # EMA weight of the newest frame
+        self.enter = COS_THRESHOLD - margin         # Finger becomes extended below this
+        self.exit = COS_THRESHOLD + margin          # ...and closed again above this
+        self.cos = None
+        self.raw = None                             # Cosines of the newest frame
+        self.tolerance = margin                     # EMA counts as caught up within this of the raw cosines
+        self.extended = np.zeros(NUM_FINGERS, dtype=bool)
+        self.palm = 0.0
+        self.vote = CountVote(n, k, NUM_FINGERS)
+        self.published = (0, np.zeros(NUM_FINGERS, dtype=bool), False)
+
+    def update(self, cosines, palm):
+        """Feed one frame's finger cosines (5,) and palm flag; return (count, mask, palm)."""
+        self.raw = cosines
+        if self.cos is None:
+            self.cos = cosines.astype(np.float32)
+        else:
+            self.cos += self.alpha * (cosines - self.cos)
+        self.extended = np.where(self.extended, self.cos < self.exit, self.cos < self.enter)
+        self.palm += self.alpha * (float(palm) - self.palm)
+
+        count = int(self.extended.sum())
+        voted = self.vote.update(count)
+        # Keep the finger list consistent with the voted count
+        if voted == count:
+            self.published = (count, self.extended.copy(), self.palm > 0.5)
+        return self.published
+
+    def settled(self):
+        """True once the EMA has caught up with the raw cosines and the vote is unanimous."""
+        if self.cos is None:
+            return True
+        return float(np.abs(self.cos - self.raw).max()) < self.tolerance and self.vote.settled()
+
+
+class HandSmoother:
+    """Keep one FingerFilter per tracked hand, keyed by handedness label."""
+
+    def __init__(self, max_missing=5, **filter_options):
+        self.max_missing = max_missing  # Frames a hand may vanish before its filter is dropped
+        self.filter_options = filter_options
+        self.filters = {}
+        self.missing = {}
+
+    def update(self, labels, cosines, palms):
+        """Smooth a batch of hands; returns a list of (count, mask, palm) per hand.
+
+        Hands missing from this frame are held at their last result until
+        max_missing runs out, so one missed detection does not drop the total.
+        """
+        results = []
+        seen = set()
+        for i, label in enumerate(labels):
+            # Two hands with the same label (a misclassification) still get separate filters
+            key = label if label not in seen else f'{label}-{i}'
+            seen.add(key)
+            hand_filter = self.filters.get(key)
+            if hand_filter is None:
+                hand_filter = self.filters[key] = FingerFilter(**self.filter_options)
+            self.missing[key] = 0
+            results.append(hand_filter.update(cosines[i], palms[i]))
+
+        for key in list(self.filters):
+            if key not in seen:
+                self.missing[key] += 1
+                if self.missing[key] > self.max_missing:
+                    del self.filters[key]
+                    del self.missing[key]
+                else:
+                    results.append(self.filters[key].published)
+        return results
+
+    def settled(self):
+        """True when no hand is being held and every count has settled."""
+        return not any(self.missing.values()) and all(f.settled() for f in self.filters.values())
@@ -0,0 +1,151 @@
+"""
+Adaptive JPEG encoder
+- Picks resolution and quality from a ladder based on viewers and encode time
+- Encodes each rung at most once per frame and shares the bytes across viewers
+- Defers annotation and encoding until someone actually asks for the frame
+"""
+
+import base64
+import threading
+import time
+
+import cv2
+
+# (max width, JPEG quality), best first
+DEFAULT_LADDER = [
+    (1280, 80),
+    (960, 70),
+    (640, 60),
+    (480, 50)
+]
+
+
+def _ignore(stage, seconds):
+    pass
+
+
+class EncodedFrame:
+    """One published frame; its annotation and JPEG encodings are built lazily, once."""
+
+    __slots__ = ('seq', 'frame', 'rung', 'encoder', '_annotate', '_jpegs', '_b64', '_lock')
+
+    def __init__(self, seq, frame, rung, encoder, annotate=None):
+        self.seq = seq
+        self.frame = frame
+        self.rung = rung
+        self.encoder = encoder
+        self._annotate = annotate
+        self._jpegs = {}
+        self._b64 = None
+        self._lock = threading.Lock()
+
+    def jpeg(self, rung=None):
+        """Return JPEG bytes for a rung (default: the rung chosen at publish time)."""
+        rung = self.rung if rung is None else max(0, min(rung, len(self.encoder.ladder) - 1))
+        data = self._jpegs.get(rung)
+        if data is not None:
+            return data
+        with self._lock:
+            data = self._jpegs.get(rung)
+            if data is None:
+                if self._annotate is not None:
+                    self._annotate(self.frame)
+                    self._annotate = None
+                data = self.encoder.encode(self.frame, rung)
+                self._jpegs[rung] = data
+            return data
+
+    def base64(self):
+        """Base64 bytes of the default rung, for JSON clients. Built once."""
+        if self._b64 is None:
+            self._b64 = base64.b64encode(self.jpeg())
+        return self._b64
+
+
+class AdaptiveEncoder:
+    """Choose a ladder rung from viewer count and measured encode time."""
+
+    def __init__(self, ladder=None, budget_ms=15.0, viewer_timeout=2.0, adjust_every=15, observe=None):
+        self.ladder = ladder or DEFAULT_LADDER
+        self.budget = budget_ms / 1000.0    # Encode time allowed per frame
+        self.viewer_timeout = viewer_timeout  # Seconds a poller counts as a viewer after its last request
+        self.adjust_every = adjust_every    # Encodes between rung adjustments
+        self.pressure = 0                   # Extra rungs down caused by slow encodes
+        self.encode_ms = 0.0
+        self.encodes = 0
+        self.skipped = 0
+        self.bytes_out = 0
+        self.observe = observe or _ignore   # observe('encode', seconds) per JPEG encode
+        self._stream_viewers = 0
+        self._last_poll = 0.0
+        self._lock = threading.Lock()
+
+    def open_viewer(self):
+        with self._lock:
+            self._stream_viewers += 1
+
+    def close_viewer(self):
+        with self._lock:
+            self._stream_viewers -= 1
+
+    def touch(self):
+        """Record a polling client, which counts as a viewer for viewer_timeout seconds."""
+        self._last_poll = time.monotonic()
+
+    def viewers(self):
+        polling = 1 if time.monotonic() - self._last_poll < self.viewer_timeout else 0
+        return self._stream_viewers + polling
+
+    def select_rung(self):
+        """Step down the ladder as viewers grow and when encoding runs over budget."""
+        n = self.viewers()
+        base = 0 if n <= 2 else 1 if n <= 5 else 2
+        return min(base + self.pressure, len(self.ladder) - 1)
+
+    def wrap(self, seq, frame, annotate=None):
+        """Publish a frame; encode the current rung now only if someone is watching."""
+        encoded = EncodedFrame(seq, frame, self.select_rung(), self, annotate)
+        if self.viewers() > 0:
+            encoded.jpeg()
+        else:
+            self.skipped += 1
+        return encoded
+
+    def encode(self, frame, rung):
+        max_width, quality = self.ladder[rung]
+        start = time.perf_counter()
+        h, w = frame.shape[:2]
+        if w > max_width:
+            frame = cv2.resize(frame, (max_width, int(h * max_width / w)), interpolation=cv2.INTER_AREA)
+        ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise ValueError('JPEG encoding failed')
+        data = buffer.tobytes()
+        self._record(time.perf_counter() - start, len(data))
+        return data
+
+    def _record(self, elapsed, size):
+        self.observe('encode', elapsed)
+        self.encodes += 1
+        self.bytes_out += size
+        self.encode_ms = 0.9 * self.encode_ms + 0.1 * elapsed * 1000.0
+        if self.encodes % self.adjust_every:
+            return
+        if self.encode_ms > self.budget * 1000.0:
+            self.pressure = min(self.pressure + 1, len(self.ladder) - 1)
+        elif self.encode_ms < self.budget * 500.0 and self.pressure > 0:
+            self.pressure -= 1
+
+    def stats(self):
+        rung = self.select_rung()
+        max_width, quality = self.ladder[rung]
+        return {
+            'viewers': self.viewers(),
+            'rung': rung,
+            'max_width': max_width,
+            'quality': quality,
+            'encode_ms': round(self.encode_ms, 2),
+            'encodes': self.encodes,
+            'skipped': self.skipped,
+            'bytes_out': self.bytes_out
+        }
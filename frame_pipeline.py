@@ -0,0 +1,201 @@
+"""
+Staged frame pipeline
+- Each stage runs on its own thread
+- Stages are joined by bounded queues that drop the oldest frame when full
+- Every stage reports its own throughput and latency
+"""
+
+import threading
+import time
+import traceback
+from collections import deque
+
+
+class DropOldestQueue:
+    """Bounded queue that discards the oldest item instead of blocking the producer."""
+
+    def __init__(self, maxsize=2):
+        self._items = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Return the oldest item, or None if nothing arrived within timeout."""
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def clear(self):
+        with self._cond:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class StageStats:
+    """Throughput and latency counters for one pipeline stage."""
+
+    def __init__(self, window=1.0):
+        self.window = window
+        self.processed = 0
+        self.errors = 0
+        self.fps = 0.0
+        self.latency_ms = 0.0
+        self._window_start = time.perf_counter()
+        self._window_count = 0
+
+    def record(self, elapsed):
+        self.processed += 1
+        self._window_count += 1
+        # Smooth latency so a single slow frame does not dominate the report
+        self.latency_ms = 0.9 * self.latency_ms + 0.1 * elapsed * 1000.0
+        now = time.perf_counter()
+        span = now - self._window_start
+        if span >= self.window:
+            self.fps = self._window_count / span
+            self._window_start = now
+            self._window_count = 0
+
+    def as_dict(self):
+        return {
+            'processed': self.processed,
+            'errors': self.errors,
+            'fps': round(self.fps, 2),
+            'latency_ms': round(self.latency_ms, 2)
+        }
+
+
+class Stage:
+    """A worker thread that applies func to items from inbox and forwards results to outbox.
+
+    A stage without an inbox is a source: func is called with no arguments.
+    Returning None from func drops the item.
+    """
+
+    def __init__(self, name, func, inbox=None, outbox=None, errors=None):
+        self.name = name
+        self.func = func
+        self.inbox = inbox
+        self.outbox = outbox
+        self.errors = errors if errors is not None else []
+        self.stats = StageStats()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True, name=self.name)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+
+    def join(self, timeout=None):
+        """Wait for the thread to finish its current item; True once it has exited."""
+        if self.thread is not None:
+            self.thread.join(timeout)
+        return not self.is_alive()
+
+    def is_alive(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def _run(self):
+        print(f"Stage '{self.name}' started")
+        while self.running:
+            if self.inbox is not None:
+                item = self.inbox.get(timeout=0.1)
+                if item is None:
+                    continue
+            start = time.perf_counter()
+            try:
+                if self.inbox is None:
+                    result = self.func()
+                else:
+                    result = self.func(item)
+            except Exception as e:
+                print(f"ERROR in stage '{self.name}': {e}")
+                print(traceback.format_exc())
+                self.errors.append(f"{self.name}: {e}")
+                self.stats.errors += 1
+                time.sleep(0.05)
+                continue
+            if result is None:
+                continue
+            self.stats.record(time.perf_counter() - start)
+            if self.outbox is not None:
+                self.outbox.put(result)
+        print(f"Stage '{self.name}' stopped")
+
+
+class FramePipeline:
+    """Chain of stages connected by drop-oldest queues."""
+
+    def __init__(self, source, *steps, queue_size=2, errors=None):
+        self.errors = errors if errors is not None else []
+        self.queues = []
+        self.stages = []
+
+        name, func = source
+        outbox = DropOldestQueue(queue_size) if steps else None
+        self.stages.append(Stage(name, func, None, outbox, self.errors))
+        if outbox is not None:
+            self.queues.append(outbox)
+
+        for i, (name, func) in enumerate(steps):
+            inbox = outbox
+            outbox = DropOldestQueue(queue_size) if i < len(steps) - 1 else None
+            self.stages.append(Stage(name, func, inbox, outbox, self.errors))
+            if outbox is not None:
+                self.queues.append(outbox)
+
+    def start(self):
+        # Start consumers first so the source never fills an unattended queue
+        for stage in reversed(self.stages):
+            stage.start()
+
+    def stop(self, timeout=2.0):
+        """Stop every stage and wait up to timeout seconds in total for them to exit.
+
+        Returns True if all stage threads have exited.
+        """
+        for stage in self.stages:
+            stage.stop()
+        deadline = time.perf_counter() + timeout
+        stopped = True
+        for stage in self.stages:
+            if not stage.join(max(0.0, deadline - time.perf_counter())):
+                print(f"Stage '{stage.name}' did not stop within {timeout}s")
+                stopped = False
+        for queue in self.queues:
+            queue.clear()
+        return stopped
+
+    def is_alive(self):
+        return all(stage.is_alive() for stage in self.stages)
+
+    def bottleneck_latency(self):
+        """Latency in seconds of the slowest non-source stage."""
+        latencies = [stage.stats.latency_ms for stage in self.stages[1:]]
+        return max(latencies, default=0.0) / 1000.0
+
+    def stats(self):
+        """Per-stage throughput plus queue depth and drop counts."""
+        report = {}
+        for stage in self.stages:
+            entry = stage.stats.as_dict()
+            if stage.outbox is not None:
+                entry['queue_depth'] = len(stage.outbox)
+                entry['dropped'] = stage.outbox.dropped
+            report[stage.name] = entry
+        return report
@@ -0,0 +1,126 @@
+"""
+Shared-memory frame ring buffer
+- Fixed slots in one multiprocessing.shared_memory block, sized for the largest frame
+- One writer (capture) fills slots in turn; readers take the newest committed slot
+- Every slot carries a sequence number, so a reader can tell whether the writer
+  has lapped it while it was still using the frame
+- Frames are exposed as NumPy views of the shared block; nothing is pickled or copied
+"""
+
+import struct
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# latest committed seq, slot count, bytes per slot
+HEADER = struct.Struct('<QII')
+# seq (0 while being written), capture time (perf_counter), capture stage seconds, height, width, channels
+SLOT_HEADER = struct.Struct('<QddHHH')
+ALIGN = 64
+DEFAULT_SLOTS = 4
+DEFAULT_CAPACITY = 1920 * 1080 * 3
+
+
+def _align(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+class FrameRing:
+    """Single-writer, many-reader ring of uint8 frames in shared memory."""
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.name = shm.name
+        self.owner = owner
+        _, self.slots, self.capacity = HEADER.unpack_from(shm.buf, 0)
+        self.slot_size = _align(SLOT_HEADER.size) + _align(self.capacity)
+        self._writing = None  # (seq, offset, shape) between acquire() and commit()
+
+    @classmethod
+    def create(cls, slots=DEFAULT_SLOTS, capacity=DEFAULT_CAPACITY):
+        slot_size = _align(SLOT_HEADER.size) + _align(capacity)
+        shm = shared_memory.SharedMemory(create=True, size=_align(HEADER.size) + slots * slot_size)
+        shm.buf[:_align(HEADER.size)] = bytes(_align(HEADER.size))
+        HEADER.pack_into(shm.buf, 0, 0, slots, capacity)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        # Attaching processes are children of the creator and share its resource tracker
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    def _offset(self, seq):
+        return _align(HEADER.size) + (seq % self.slots) * self.slot_size
+
+    def _view(self, offset, shape):
+        return np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf, offset=offset + _align(SLOT_HEADER.size))
+
+    def latest_seq(self):
+        return struct.unpack_from('<Q', self.shm.buf, 0)[0]
+
+    # Writer side
+
+    def acquire(self, shape):
+        """Return a writable view of the next slot, e.g. as cv2.flip's dst. Call commit() when filled."""
+        shape = tuple(shape)
+        if int(np.prod(shape)) > self.capacity:
+            raise ValueError(f"Frame {shape} does not fit a {self.capacity}-byte ring slot")
+        seq = self.latest_seq() + 1
+        offset = self._offset(seq)
+        # Readers treat seq 0 as "being written"
+        struct.pack_into('<Q', self.shm.buf, offset, 0)
+        self._writing = (seq, offset, shape)
+        return self._view(offset, shape)
+
+    def commit(self, captured_at, capture_seconds=0.0):
+        """Publish the slot filled since acquire(); capture_seconds is how long reading it took."""
+        seq, offset, shape = self._writing
+        height, width = shape[:2]
+        channels = shape[2] if len(shape) > 2 else 1
+        SLOT_HEADER.pack_into(self.shm.buf, offset, seq, captured_at, capture_seconds, height, width, channels)
+        struct.pack_into('<Q', self.shm.buf, 0, seq)
+        self._writing = None
+        return seq
+
+    def write(self, frame, captured_at):
+        """Copy a frame into the next slot and publish it."""
+        np.copyto(self.acquire(frame.shape), frame)
+        return self.commit(captured_at)
+
+    # Reader side
+
+    def latest(self, after=0):
+        """Return (seq, captured_at, capture_seconds, view) for the newest frame newer than after, or None.
+
+        The view aliases shared memory: check valid(seq) after using it, since
+        the writer reuses the slot once it has wrapped around the ring.
+        """
+        seq = self.latest_seq()
+        if seq <= after:
+            return None
+        offset = self._offset(seq)
+        slot_seq, captured_at, capture_seconds, height, width, channels = SLOT_HEADER.unpack_from(self.shm.buf, offset)
+        if slot_seq != seq:
+            return None
+        shape = (height, width, channels) if channels > 1 else (height, width)
+        return seq, captured_at, capture_seconds, self._view(offset, shape)
+
+    def wait(self, after=0, timeout=1.0, poll=0.002):
+        """Like latest(), but poll until a newer frame arrives or timeout passes."""
+        deadline = time.perf_counter() + timeout
+        while True:
+            frame = self.latest(after)
+            if frame is not None or time.perf_counter() >= deadline:
+                return frame
+            time.sleep(poll)
+
+    def valid(self, seq):
+        """True while the slot still holds frame seq."""
+        return struct.unpack_from('<Q', self.shm.buf, self._offset(seq))[0] == seq
+
+    def close(self):
+        """Release the block; every view handed out must be dropped first."""
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
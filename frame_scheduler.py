@@ -0,0 +1,81 @@
+"""
+Deadline-based frame scheduler
+- Paces the capture stage to a per-frame deadline instead of a fixed sleep
+- Sleeps only for the time left until the next deadline
+- Skips frame slots when the slowest pipeline stage cannot keep up
+- Reports target vs. achieved FPS, end-to-end latency and frames over the latency budget
+"""
+
+import math
+import time
+
+
+class FrameScheduler:
+    """Schedule frames against a target FPS; frames over the optional latency budget are counted."""
+
+    def __init__(self, target_fps=15, latency_budget_ms=None, max_skip=5):
+        self.target_fps = float(target_fps)
+        self.period = 1.0 / self.target_fps
+        self.latency_budget = latency_budget_ms / 1000.0 if latency_budget_ms else None
+        self.max_skip = max_skip
+        self.skip = 0
+        self.next_deadline = None
+        self.late_frames = 0
+        self.over_budget = 0
+        self.frames_done = 0
+        self.achieved_fps = 0.0
+        self.latency_ms = 0.0
+        self._window_start = time.perf_counter()
+        self._window_count = 0
+
+    def observe(self, stage_latency):
+        """Adapt frame skipping to the latency of the slowest stage (seconds)."""
+        # A stage taking n frame periods gets every n-th slot, so queues never build.
+        # The latency budget is only reported (over_budget): skipping slots lowers
+        # throughput but cannot make a single slow frame any faster
+        if stage_latency <= self.period:
+            self.skip = 0
+        else:
+            self.skip = min(self.max_skip, math.ceil(stage_latency / self.period) - 1)
+
+    def wait(self):
+        """Sleep until the next frame deadline and return the time it was due."""
+        now = time.perf_counter()
+        if self.next_deadline is None:
+            self.next_deadline = now
+        remaining = self.next_deadline - now
+        if remaining > 0:
+            time.sleep(remaining)
+            due = self.next_deadline
+        else:
+            # Behind schedule: start from now instead of bursting to catch up
+            if remaining < -self.period:
+                self.late_frames += 1
+            due = now
+        self.next_deadline = due + self.period * (1 + self.skip)
+        return due
+
+    def frame_done(self, latency):
+        """Record one published frame and its capture-to-publish latency (seconds)."""
+        self.frames_done += 1
+        self._window_count += 1
+        self.latency_ms = 0.9 * self.latency_ms + 0.1 * latency * 1000.0
+        if self.latency_budget is not None and latency > self.latency_budget:
+            self.over_budget += 1
+        now = time.perf_counter()
+        span = now - self._window_start
+        if span >= 1.0:
+            self.achieved_fps = self._window_count / span
+            self._window_start = now
+            self._window_count = 0
+
+    def stats(self):
+        return {
+            'target_fps': self.target_fps,
+            'achieved_fps': round(self.achieved_fps, 2),
+            'skip': self.skip,
+            'latency_ms': round(self.latency_ms, 2),
+            'latency_budget_ms': self.latency_budget * 1000.0 if self.latency_budget else None,
+            'late_frames': self.late_frames,
+            'over_budget': self.over_budget
+        }
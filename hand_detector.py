@@ -0,0 +1,161 @@
+"""
+Hand detection and finger counting for one video stream
+- Wraps a MediaPipe Hands instance with ROI tracking and temporal smoothing
+- Shared by the live server, offline replay and batch tools so they all
+  count fingers the same way
+"""
+
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+import landmark_engine
+from finger_smoothing import HandSmoother
+from roi_tracker import RoiTracker
+
+mp_hands = mp.solutions.hands
+mp_drawing = mp.solutions.drawing_utils
+
+
+def _ignore(stage, seconds):
+    pass
+
+
+class HandDetector:
+    """Detect hands in BGR frames and return their finger state."""
+
+    def __init__(self, roi_tracking=True, smoothing=True, static_image_mode=False,
+                 max_num_hands=2, min_detection_confidence=0.7, min_tracking_confidence=0.7, observe=None):
+        self.hands = mp_hands.Hands(
+            static_image_mode=static_image_mode,
+            max_num_hands=max_num_hands,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence
+        )
+        self.roi_tracker = RoiTracker() if roi_tracking else None
+        self.smoother = HandSmoother() if smoothing else None
+        self.last_points = None  # (N, 21, 3) landmarks of the last classified frame
+        self.observe = observe or _ignore  # observe(stage, seconds) for convert/inference/classify timings
+
+    def to_rgb(self, frame):
+        """Convert a BGR frame for MediaPipe, timed as the convert stage."""
+        start = time.perf_counter()
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        self.observe('convert', time.perf_counter() - start)
+        return rgb_frame
+
+    def run_detector(self, rgb_frame):
+        """Run MediaPipe and return (landmarks, handedness labels) for every hand."""
+        start = time.perf_counter()
+        results = self.hands.process(rgb_frame)
+        self.observe('inference', time.perf_counter() - start)
+        multi_hand_landmarks = results.multi_hand_landmarks or []
+        labels = [h.classification[0].label for h in results.multi_handedness or []]
+        if len(labels) != len(multi_hand_landmarks):
+            labels = [str(i) for i in range(len(multi_hand_landmarks))]
+        return multi_hand_landmarks, labels
+
+    def find_hands(self, frame):
+        """Return (landmarks, labels) in full-frame coordinates for a BGR frame."""
+        if self.roi_tracker is None:
+            return self.run_detector(self.to_rgb(frame))
+
+        # Search only around where the hands were last seen
+        search_frame, roi = self.roi_tracker.crop(frame)
+        multi_hand_landmarks, labels = self.run_detector(self.to_rgb(search_frame))
+        if roi is not None:
+            if multi_hand_landmarks:
+                self.roi_tracker.to_frame(multi_hand_landmarks, roi)
+            else:
+                # Hand lost: fall back to a full-frame search right away
+                multi_hand_landmarks, labels = self.run_detector(self.to_rgb(frame))
+        self.roi_tracker.update(multi_hand_landmarks, frame.shape)
+        return multi_hand_landmarks, labels
+
+    def classify(self, multi_hand_landmarks, labels):
+        """Return (total_fingers, extended_fingers, palm_facing) for the detected hands."""
+        total_fingers = 0
+        all_extended = []
+        palm_facing = False
+        self.last_points = None
+
+        hand_states = []
+        if multi_hand_landmarks:
+            # Classify every hand in one batched pass
+            points = landmark_engine.landmarks_to_array(multi_hand_landmarks)
+            self.last_points = points
+            if self.smoother is None:
+                counts, extended_mask, palms = landmark_engine.classify_hands(points)
+                hand_states = zip(counts, extended_mask, palms)
+            else:
+                cosines = landmark_engine.finger_cosines(points)
+                hand_states = self.smoother.update(labels, cosines, landmark_engine.palm_facing(points))
+        elif self.smoother is not None:
+            # Briefly missed hands still contribute their held counts
+            hand_states = self.smoother.update([], None, None)
+
+        for count, mask, palm in hand_states:
+            total_fingers += int(count)
+            all_extended.extend(landmark_engine.extended_list(mask))
+            palm_facing = bool(palm)
+        return total_fingers, all_extended, palm_facing
+
+    def settled(self):
+        """True when the smoothed counts would not change if the scene stays still."""
+        return self.smoother is None or self.smoother.settled()
+
+    def detect(self, frame):
+        """Detect and classify hands in a BGR frame; returns (landmarks, finger state)."""
+        multi_hand_landmarks, labels = self.find_hands(frame)
+        start = time.perf_counter()
+        finger_state = self.classify(multi_hand_landmarks, labels)
+        self.observe('classify', time.perf_counter() - start)
+        return multi_hand_landmarks, finger_state
+
+    def warm_up(self, frames=3, shape=(720, 1280, 3)):
+        """Run the detector on synthetic frames so graph setup is paid before serving; returns seconds."""
+        start = time.perf_counter()
+        frame = np.random.default_rng(0).integers(0, 256, size=shape, dtype=np.uint8)
+        # Keep warm-up runs out of the stage timings
+        observe, self.observe = self.observe, _ignore
+        try:
+            for _ in range(frames):
+                self.detect(frame)
+        finally:
+            self.observe = observe
+        self.reset()
+        return time.perf_counter() - start
+
+    def reset(self):
+        """Forget tracking and smoothing state before starting an unrelated stream."""
+        if self.roi_tracker is not None:
+            self.roi_tracker.reset()
+        if self.smoother is not None:
+            self.smoother = HandSmoother()
+        # Older MediaPipe releases have no reset(); they re-detect once tracking is lost
+        reset_graph = getattr(self.hands, 'reset', None)
+        if reset_graph is not None:
+            reset_graph()
+
+    def stats(self):
+        return {
+            'roi': self.roi_tracker.stats() if self.roi_tracker else None,
+            'smoothing': self.smoother is not None
+        }
+
+    def close(self):
+        self.hands.close()
+
+
+def draw_hands(frame, multi_hand_landmarks):
+    """Draw hand skeletons onto the frame."""
+    for hand_landmarks in multi_hand_landmarks:
+        mp_drawing.draw_landmarks(
+            frame,
+            hand_landmarks,
+            mp_hands.HAND_CONNECTIONS,
+            mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
+            mp_drawing.DrawingSpec(color=(255, 0, 0), thickness=2)
+        )
@@ -0,0 +1,69 @@
+"""
+Vectorized landmark engine for finger classification
+- Converts MediaPipe hand landmarks to one (N_hands, 21, 3) float32 array
+- Computes all finger angles, the extended mask and palm facing in one pass
+"""
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+NUM_FINGERS = 5
+
+# Joint triplets per finger: thumb, index, middle, ring, pinky
+# Thumb uses MCP/IP/TIP, the other fingers use MCP/PIP/TIP
+FINGER_BASE = np.array([2, 5, 9, 13, 17])
+FINGER_JOINT = np.array([3, 6, 10, 14, 18])
+FINGER_TIP = np.array([4, 8, 12, 16, 20])
+
+WRIST = 0
+INDEX_MCP = 5
+PINKY_MCP = 17
+
+COS_THRESHOLD = -0.5
+
+
+def landmarks_to_array(multi_hand_landmarks, out=None):
+    """Pack a list of MediaPipe hand landmarks into an (N, 21, 3) float32 array."""
+    n = len(multi_hand_landmarks)
+    if out is None or out.shape[0] < n:
+        out = np.empty((n, NUM_LANDMARKS, 3), dtype=np.float32)
+    points = out[:n]
+    flat = points.reshape(n, NUM_LANDMARKS * 3)
+    for i, hand_landmarks in enumerate(multi_hand_landmarks):
+        flat[i] = [c for p in hand_landmarks.landmark for c in (p.x, p.y, p.z)]
+    return points
+
+
+def finger_cosines(points):
+    """Cosine of the middle joint angle for every finger, shape (N, 5)."""
+    joint = points[:, FINGER_JOINT]
+    v1 = points[:, FINGER_TIP] - joint
+    v2 = points[:, FINGER_BASE] - joint
+    dot = np.einsum('nfk,nfk->nf', v1, v2)
+    denom = np.sqrt(np.einsum('nfk,nfk->nf', v1, v1) * np.einsum('nfk,nfk->nf', v2, v2))
+    cos = np.ones_like(dot)
+    np.divide(dot, denom, out=cos, where=denom > 1e-6)
+    return cos
+
+
+def palm_facing(points):
+    """Estimate whether each palm faces the camera, shape (N,) bool."""
+    wrist = points[:, WRIST]
+    v1 = points[:, INDEX_MCP] - wrist
+    v2 = points[:, PINKY_MCP] - wrist
+    # Only the z component of the palm normal is needed
+    normal_z = v1[:, 0] * v2[:, 1] - v1[:, 1] * v2[:, 0]
+    avg_tips_z = points[:, FINGER_TIP, 2].mean(axis=1)
+    return (normal_z < 0) | (avg_tips_z < wrist[:, 2])
+
+
+def classify_hands(points, threshold=COS_THRESHOLD):
+    """Return (counts, extended_mask, palm) arrays for a batch of hands."""
+    cos = finger_cosines(points)
+    extended = cos < threshold
+    return extended.sum(axis=1), extended, palm_facing(points)
+
+
+def extended_list(mask_row):
+    """Convert one row of the extended mask to a list of finger indices."""
+    return [int(f) for f in np.flatnonzero(mask_row)]
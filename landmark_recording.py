@@ -0,0 +1,213 @@
+"""
+Compact binary recording format for hand landmark streams
+- Per frame: a timestamp, a hand count and one 21x3 float32 block per hand
+- Columnar layout with a small per-frame index, finalized on close()
+- Until then a journal file next to the recording holds each frame's timestamp
+  and hand count, so recover() can finalize a recording cut short by a crash
+- The reader memory-maps the file and exposes zero-copy NumPy views
+
+File layout (little endian):
+    header   64 bytes: magic, version, frame count, hand count, column offsets
+    points   float32[hands, 21, 3]
+    times    float64[frames]
+    counts   uint8[frames]
+    index    uint64[frames + 1]   start of each frame's hands in points
+
+Journal (<path>.journal, removed by close()): one (float64 timestamp, uint64 hands) per frame.
+
+Usage:
+    python landmark_recording.py recover session.flm
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+
+import numpy as np
+
+import landmark_engine
+from landmark_engine import NUM_LANDMARKS
+
+MAGIC = b'FCLM'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIQQQQQQ')
+HEADER_SIZE = 64
+HAND_BYTES = NUM_LANDMARKS * 3 * 4
+JOURNAL = np.dtype([('timestamp', '<f8'), ('hands', '<u8')])
+
+
+def _align(offset, alignment=8):
+    return (offset + alignment - 1) // alignment * alignment
+
+
+def journal_path(path):
+    return f'{path}.journal'
+
+
+def _finalize(file, timestamps, counts, hands):
+    """Append the per-frame columns after the points and write the header."""
+    frames = len(counts)
+    counts = np.asarray(counts, dtype=np.uint8)
+    index = np.zeros(frames + 1, dtype=np.uint64)
+    np.cumsum(counts, out=index[1:])
+
+    points_offset = HEADER_SIZE
+    times_offset = _align(points_offset + hands * HAND_BYTES)
+    counts_offset = times_offset + frames * 8
+    index_offset = _align(counts_offset + frames)
+
+    file.seek(points_offset + hands * HAND_BYTES)
+    file.write(b'\0' * (times_offset - file.tell()))
+    file.write(np.asarray(timestamps, dtype=np.float64).tobytes())
+    file.write(counts.tobytes())
+    file.write(b'\0' * (index_offset - file.tell()))
+    file.write(index.tobytes())
+    file.truncate()
+
+    file.seek(0)
+    file.write(HEADER.pack(MAGIC, VERSION, 0, 0, frames, hands,
+                           points_offset, times_offset, counts_offset, index_offset))
+
+
+class LandmarkRecorder:
+    """Append frames of landmarks to a recording file."""
+
+    def __init__(self, path, flush_every=30):
+        self.path = path
+        self.flush_every = flush_every  # Frames between flushes; a crash loses at most this many
+        self.file = open(path, 'wb')
+        self.file.write(b'\0' * HEADER_SIZE)
+        self.journal = open(journal_path(path), 'wb')
+        self.timestamps = []
+        self.counts = []
+        self.hands = 0
+
+    def write(self, timestamp, points):
+        """Record one frame; points is an (N, 21, 3) array, possibly empty."""
+        n = 0 if points is None else len(points)
+        if n:
+            self.file.write(np.ascontiguousarray(points, dtype=np.float32).tobytes())
+        self.journal.write(np.array((timestamp, n), dtype=JOURNAL).tobytes())
+        self.timestamps.append(timestamp)
+        self.counts.append(n)
+        self.hands += n
+        if len(self.counts) % self.flush_every == 0:
+            self.flush()
+
+    def flush(self):
+        # Points first, so every journaled frame has its landmarks on disk
+        self.file.flush()
+        self.journal.flush()
+
+    def write_landmarks(self, timestamp, multi_hand_landmarks):
+        """Record one frame straight from MediaPipe landmarks."""
+        points = landmark_engine.landmarks_to_array(multi_hand_landmarks) if multi_hand_landmarks else None
+        self.write(timestamp, points)
+
+    def close(self):
+        """Write the per-frame columns and the header, then drop the journal."""
+        if self.file is None:
+            return
+        _finalize(self.file, self.timestamps, self.counts, self.hands)
+        self.file.close()
+        self.file = None
+        self.journal.close()
+        os.remove(journal_path(self.path))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LandmarkRecording:
+    """Memory-mapped, read-only view of a recording file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, _, frames, hands, points_offset, times_offset, counts_offset, index_offset = \
+            HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a landmark recording (if it was never closed, try recover())")
+        if version != VERSION:
+            raise ValueError(f"Unsupported recording version {version}")
+
+        buffer = self._mmap
+        self.points = np.frombuffer(buffer, np.float32, hands * NUM_LANDMARKS * 3, points_offset) \
+            .reshape(hands, NUM_LANDMARKS, 3)
+        self.timestamps = np.frombuffer(buffer, np.float64, frames, times_offset)
+        self.hand_counts = np.frombuffer(buffer, np.uint8, frames, counts_offset)
+        self.index = np.frombuffer(buffer, np.uint64, frames + 1, index_offset)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def frame(self, i):
+        """Return (timestamp, points view of shape (N, 21, 3)) for frame i."""
+        start, end = int(self.index[i]), int(self.index[i + 1])
+        return float(self.timestamps[i]), self.points[start:end]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.frame(i)
+
+    def frame_of_hand(self):
+        """Frame number of every hand in points, shape (hands,)."""
+        return np.repeat(np.arange(len(self)), self.hand_counts)
+
+    def classify(self, threshold=landmark_engine.COS_THRESHOLD):
+        """Run the finger classifier over every hand at once; returns total fingers per frame."""
+        counts, _, _ = landmark_engine.classify_hands(self.points, threshold)
+        return np.bincount(self.frame_of_hand(), weights=counts, minlength=len(self)).astype(np.int64)
+
+    def close(self):
+        # Views must be released before the map can be closed
+        self.points = self.timestamps = self.hand_counts = self.index = None
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def recover(path):
+    """Finalize a recording whose writer died before close(); returns the frames kept.
+
+    Frames are kept up to the last one whose journal entry and landmarks both
+    reached the disk.
+    """
+    with open(journal_path(path), 'rb') as f:
+        data = f.read()
+    entries = np.frombuffer(data, JOURNAL, len(data) // JOURNAL.itemsize)
+    available = max(0, os.path.getsize(path) - HEADER_SIZE) // HAND_BYTES
+    frames = int(np.searchsorted(np.cumsum(entries['hands']), available, side='right'))
+    entries = entries[:frames]
+    with open(path, 'r+b') as f:
+        _finalize(f, entries['timestamp'], entries['hands'], int(entries['hands'].sum()))
+    os.remove(journal_path(path))
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Landmark recording tools.')
+    parser.add_argument('command', choices=['recover'], help='recover: finalize a recording left unclosed by a crash')
+    parser.add_argument('path', help='Recording file')
+    args = parser.parse_args()
+    try:
+        frames = recover(args.path)
+    except FileNotFoundError:
+        print(f"No journal for {args.path}; it was closed normally or never started", file=sys.stderr)
+        return 1
+    print(f"Recovered {frames} frames into {args.path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,6 +5,9 @@ import pygame
 import random
 import time
 
+from camera_capture import LatestFrameCapture
+from finger_smoothing import CountVote
+
 class KidsHandGame:
     def __init__(self):
         # Initialize MediaPipe
@@ -17,6 +20,9 @@ class KidsHandGame:
         )
         self.mp_draw = mp.solutions.drawing_utils
         
+        # Require a count to win 3 of the last 5 frames before showing it
+        self.count_vote = CountVote(n=5, k=3, max_count=5)
+        
         # Initialize Pygame for sound
         pygame.mixer.init()
         
@@ -291,11 +297,10 @@ class KidsHandGame:
         cv2.putText(frame, "Press M for Menu", (w - 300, h - 20),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, self.colors['white'], 2)
     
-    def run(self):
-        """Main game loop"""
-        cap = cv2.VideoCapture(0)
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+    def run(self, source=0):
+        """Main game loop (source: camera index or video file path)"""
+        # Always process the newest frame, however long the previous one took
+        cap = LatestFrameCapture(source, width=1280, height=720)
         
         print("🎮 Kids Hand Gesture Game Started!")
         print("📹 Camera opening...")
@@ -324,6 +329,8 @@ class KidsHandGame:
                     )
                     finger_count = self.count_fingers(hand_landmarks)
             
+            finger_count = self.count_vote.update(finger_count)
+            
             # Draw based on game mode
             if self.game_mode == "menu":
                 self.draw_menu(frame)
@@ -358,5 +365,6 @@ class KidsHandGame:
         print("👋 Thanks for playing!")
 
 if __name__ == "__main__":
+    import sys
     game = KidsHandGame()
-    game.run()
\ No newline at end of file
+    game.run(sys.argv[1] if len(sys.argv) > 1 else 0)
\ No newline at end of file
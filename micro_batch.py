@@ -0,0 +1,91 @@
+"""
+Micro-batching for concurrent frame requests
+- Collects items that arrive within a short window, or up to a batch size
+- Dispatches each batch as one unit of work
+- Fans the per-item results back out to the waiting callers
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """Group submitted items into batches for a dispatch function.
+
+    dispatch(items) must return a Future whose result is a list with one
+    entry per item. An entry that is an exception is raised to its caller.
+    """
+
+    def __init__(self, dispatch, window_ms=5, max_batch=8):
+        self.dispatch = dispatch
+        self.window = window_ms / 1000.0
+        self.max_batch = max(1, max_batch)
+        self.batches = 0
+        self.items = 0
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="MicroBatcher")
+        self._thread.start()
+
+    def submit(self, item):
+        """Queue one item and return a Future for its result."""
+        future = Future()
+        with self._cond:
+            self._pending.append((item, future))
+            self._cond.notify()
+        return future
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                # The first item opens the window; later arrivals join until it closes
+                deadline = time.perf_counter() + self.window
+                while len(self._pending) < self.max_batch:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                size = min(len(self._pending), self.max_batch)
+                batch = [self._pending.popleft() for _ in range(size)]
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        items = [item for item, _ in batch]
+        futures = [future for _, future in batch]
+        self.batches += 1
+        self.items += len(items)
+
+        try:
+            batch_future = self.dispatch(items)
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        def fan_out(done):
+            try:
+                results = done.result()
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                return
+            for future, result in zip(futures, results):
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+        batch_future.add_done_callback(fan_out)
+
+    def stats(self):
+        return {
+            'batches': self.batches,
+            'items': self.items,
+            'avg_batch_size': round(self.items / self.batches, 2) if self.batches else 0.0,
+            'window_ms': self.window * 1000.0,
+            'max_batch': self.max_batch
+        }
@@ -0,0 +1,78 @@
+"""
+Motion gate for the frame pipeline
+- Compares a small grayscale thumbnail of each frame against the last processed one
+- Scores the fraction of thumbnail pixels that changed noticeably, so a single
+  raised finger counts even though it barely moves the whole-frame mean
+- While a hand is tracked, its region is scored on its own as well
+- Frames below the change threshold can skip inference, drawing and encoding
+- Callers can force frames through, e.g. until the count smoother has settled
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    """Decide whether a frame differs enough from the last processed frame."""
+
+    def __init__(self, threshold=0.001, pixel_threshold=20, size=(128, 72), max_idle=5.0):
+        self.threshold = threshold              # Fraction of thumbnail pixels that must change
+        self.pixel_threshold = pixel_threshold  # Gray-level difference (0-255) for a pixel to count as changed
+        self.size = size                        # Thumbnail size used for the comparison
+        self.max_idle = max_idle                # Let one frame through at least this often (seconds)
+        self.reference = None
+        self.last_pass = 0.0
+        self.passed = 0
+        self.skipped = 0
+        self.last_score = 0.0
+
+    def thumbnail(self, frame):
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    def score(self, thumb, roi=None):
+        """Fraction of changed pixels over the whole thumbnail, or within roi if that is higher."""
+        changed = cv2.absdiff(thumb, self.reference) > self.pixel_threshold
+        score = np.count_nonzero(changed) / changed.size
+        if roi is not None:
+            # Finger motion is a large share of the hand box even when it is tiny in the frame;
+            # the whole-frame score still catches a new hand entering elsewhere
+            w, h = self.size
+            x0, y0, x1, y1 = roi
+            region = changed[int(y0 * h):int(np.ceil(y1 * h)), int(x0 * w):int(np.ceil(x1 * w))]
+            if region.size:
+                score = max(score, np.count_nonzero(region) / region.size)
+        return score
+
+    def changed(self, frame, roi=None, force=False):
+        """True if the frame should be processed.
+
+        roi is an optional (x0, y0, x1, y1) box in normalized coordinates of
+        this frame around the tracked hands. force passes the frame regardless
+        and makes it the new reference.
+        """
+        thumb = self.thumbnail(frame)
+        now = time.monotonic()
+        if not force and self.reference is not None and now - self.last_pass < self.max_idle:
+            self.last_score = self.score(thumb, roi)
+            if self.last_score < self.threshold:
+                self.skipped += 1
+                return False
+        # Compare against the last processed frame so slow drift still adds up
+        self.reference = thumb
+        self.last_pass = now
+        self.passed += 1
+        return True
+
+    def reset(self):
+        self.reference = None
+
+    def stats(self):
+        return {
+            'passed': self.passed,
+            'skipped': self.skipped,
+            'last_score': round(self.last_score, 4),
+            'threshold': self.threshold
+        }
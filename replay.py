@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+"""
+Offline replay: run the finger counting pipeline on recorded video
+- Reads video files or directories of images instead of a webcam
+- Uses the same HandDetector as the live server, with no real-time pacing
+- Writes one JSON line of results per frame
+
+Usage:
+    python replay.py recording.mp4 -o results.jsonl
+    python replay.py frames_dir/ --static --no-flip
+    python replay.py recording.mp4 -o results.jsonl --record session.flm
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import cv2
+
+from hand_detector import HandDetector
+from landmark_recording import LandmarkRecorder
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.webp'}
+
+
+def iter_frames(source):
+    """Yield (index, timestamp_ms, bgr_frame) from a video file or an image directory."""
+    path = Path(source)
+    if path.is_dir():
+        images = sorted(p for p in path.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+        for index, image_path in enumerate(images):
+            frame = cv2.imread(str(image_path))
+            if frame is None:
+                print(f"WARNING: Could not read {image_path}", file=sys.stderr)
+                continue
+            yield index, None, frame
+        return
+
+    cap = cv2.VideoCapture(str(source))
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video {source}")
+    try:
+        index = 0
+        while True:
+            success, frame = cap.read()
+            if not success:
+                break
+            yield index, cap.get(cv2.CAP_PROP_POS_MSEC), frame
+            index += 1
+    finally:
+        cap.release()
+
+
+def replay(source, out, detector, flip=True, on_frame=None, recorder=None):
+    """Process every frame of source as fast as possible; returns (frames, seconds)."""
+    frames = 0
+    start = time.perf_counter()
+    for index, timestamp_ms, frame in iter_frames(source):
+        # Live capture is mirrored before detection; do the same for parity
+        if flip:
+            frame = cv2.flip(frame, 1)
+        t0 = time.perf_counter()
+        multi_hand_landmarks, (total_fingers, all_extended, palm_facing) = detector.detect(frame)
+        latency = time.perf_counter() - t0
+        record = {
+            'frame': index,
+            'timestamp_ms': timestamp_ms,
+            'hands': len(multi_hand_landmarks),
+            'finger_count': total_fingers,
+            'extended_fingers': all_extended,
+            'palm_facing': palm_facing,
+            'latency_ms': round(latency * 1000.0, 3)
+        }
+        out.write(json.dumps(record, separators=(',', ':')) + '\n')
+        if recorder is not None:
+            recorder.write(timestamp_ms / 1000.0 if timestamp_ms is not None else float(index), detector.last_points)
+        if on_frame is not None:
+            on_frame(frame, multi_hand_landmarks)
+        frames += 1
+    return frames, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Replay recorded video through the finger counter.')
+    parser.add_argument('sources', nargs='+', help='Video files or directories of images')
+    parser.add_argument('-o', '--output', default='-', help='JSON lines output file (default: stdout)')
+    parser.add_argument('--no-flip', action='store_true', help='Do not mirror frames like the live camera')
+    parser.add_argument('--no-roi', action='store_true', help='Disable region-of-interest tracking')
+    parser.add_argument('--no-smoothing', action='store_true', help='Report raw per-frame counts')
+    parser.add_argument('--static', action='store_true', help='Treat every frame as an unrelated image')
+    parser.add_argument('--record', help='Also write landmarks to this binary recording (single source only)')
+    args = parser.parse_args(argv)
+    if args.record and len(args.sources) > 1:
+        parser.error('--record takes a single source')
+
+    recorder = LandmarkRecorder(args.record) if args.record else None
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        total_frames = 0
+        total_seconds = 0.0
+        for source in args.sources:
+            # A fresh detector per source so tracking state never leaks between recordings
+            detector = HandDetector(
+                roi_tracking=not args.no_roi,
+                smoothing=not args.no_smoothing,
+                static_image_mode=args.static
+            )
+            try:
+                frames, seconds = replay(source, out, detector, flip=not args.no_flip, recorder=recorder)
+            finally:
+                detector.close()
+            total_frames += frames
+            total_seconds += seconds
+            fps = frames / seconds if seconds else 0.0
+            print(f"{source}: {frames} frames in {seconds:.2f}s ({fps:.1f} FPS)", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if recorder is not None:
+            recorder.close()
+
+    if len(args.sources) > 1 and total_seconds:
+        print(f"Total: {total_frames} frames ({total_frames / total_seconds:.1f} FPS)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""
+Region-of-interest tracking for hand detection
+- Builds a padded bounding box around the previous frame's landmarks
+- Crops (and if needed downscales) the next frame to that box
+- Maps landmarks found in the crop back to full-frame coordinates
+- Falls back to a full-frame search when the hand is lost
+"""
+
+import cv2
+
+
+class RoiTracker:
+    """Track where the hands were last seen and crop the next frame around them."""
+
+    def __init__(self, padding=0.35, min_size=160, max_side=480, full_every=30):
+        self.padding = padding          # Padding around the landmarks, as a fraction of box size
+        self.min_size = min_size        # Smallest crop side in pixels
+        self.max_side = max_side        # Crops larger than this are downscaled
+        self.full_every = full_every    # Force a full-frame search this often to catch new hands
+        self.box = None                 # (x0, y0, x1, y1) in normalized full-frame coordinates
+        self.frames_since_full = 0
+        self.roi_frames = 0
+        self.full_frames = 0
+
+    def crop(self, frame):
+        """Return (image, roi) to run detection on; roi is None for a full-frame search."""
+        if self.box is None or self.frames_since_full >= self.full_every:
+            self.frames_since_full = 0
+            self.full_frames += 1
+            return frame, None
+
+        h, w = frame.shape[:2]
+        x0, y0, x1, y1 = self.box
+        x0, x1 = int(x0 * w), int(x1 * w)
+        y0, y1 = int(y0 * h), int(y1 * h)
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            self.box = None
+            self.full_frames += 1
+            return frame, None
+
+        crop = frame[y0:y1, x0:x1]
+        longest = max(crop.shape[:2])
+        if longest > self.max_side:
+            scale = self.max_side / longest
+            crop = cv2.resize(crop, (int(crop.shape[1] * scale), int(crop.shape[0] * scale)),
+                              interpolation=cv2.INTER_AREA)
+        self.frames_since_full += 1
+        self.roi_frames += 1
+        return crop, (x0, y0, x1, y1, w, h)
+
+    def to_frame(self, multi_hand_landmarks, roi):
+        """Map landmarks detected in a crop back to normalized full-frame coordinates, in place."""
+        x0, y0, x1, y1, w, h = roi
+        sx = (x1 - x0) / w
+        sy = (y1 - y0) / h
+        ox = x0 / w
+        oy = y0 / h
+        for hand_landmarks in multi_hand_landmarks:
+            for lm in hand_landmarks.landmark:
+                lm.x = lm.x * sx + ox
+                lm.y = lm.y * sy + oy
+                # MediaPipe scales z like x
+                lm.z = lm.z * sx
+
+    def update(self, multi_hand_landmarks, frame_shape):
+        """Remember the padded box around the detected hands, or forget it if none were found."""
+        if not multi_hand_landmarks:
+            self.box = None
+            return
+
+        xs = [lm.x for hand in multi_hand_landmarks for lm in hand.landmark]
+        ys = [lm.y for hand in multi_hand_landmarks for lm in hand.landmark]
+        h, w = frame_shape[:2]
+        x0, x1, y0, y1 = min(xs), max(xs), min(ys), max(ys)
+
+        # Pad in pixels so the box stays square-ish regardless of aspect ratio
+        side = max((x1 - x0) * w, (y1 - y0) * h)
+        pad = max(side * self.padding, (self.min_size - side) / 2, 0)
+        cx, cy = (x0 + x1) / 2 * w, (y0 + y1) / 2 * h
+        half = side / 2 + pad
+        self.box = (
+            max(0.0, (cx - half) / w),
+            max(0.0, (cy - half) / h),
+            min(1.0, (cx + half) / w),
+            min(1.0, (cy + half) / h)
+        )
+
+    def reset(self):
+        self.box = None
+
+    def stats(self):
+        return {
+            'tracking': self.box is not None,
+            'roi_frames': self.roi_frames,
+            'full_frames': self.full_frames
+        }
@@ -0,0 +1,147 @@
+"""
+Latest detection result in shared memory
+- One block per stream: written by its worker process, read by the web process
+- Two slots written alternately, each guarded by its own sequence number,
+  so a reader never sees a half-written result and never blocks the writer
+- Holds the finger state, the annotated JPEG and the worker's stage timings; nothing is pickled
+"""
+
+import base64
+import struct
+import time
+from multiprocessing import shared_memory
+
+MAX_EXTENDED = 10  # Two hands of five fingers
+# Stages timed in the worker processes, carried per result for the web process's histograms
+WORKER_STAGES = ('capture', 'convert', 'inference', 'classify', 'draw', 'encode')
+# latest seq, heartbeat (time.time()), frames written, frames dropped by the worker
+HEADER = struct.Struct('<QdQQ')
+# seq, capture timestamp, latency ms, seconds per worker stage (0 if skipped),
+# finger count, palm facing, extended count, extended fingers, JPEG length
+SLOT_HEADER = struct.Struct(f'<Qdf{len(WORKER_STAGES)}fBBB{MAX_EXTENDED}sI')
+DEFAULT_JPEG_CAPACITY = 1 << 20
+
+
+class StoredFrame:
+    """A JPEG copied out of shared memory; stands in for EncodedFrame in snapshots."""
+
+    __slots__ = ('seq', '_jpeg', '_b64')
+
+    def __init__(self, seq, jpeg):
+        self.seq = seq
+        self._jpeg = jpeg
+        self._b64 = None
+
+    def jpeg(self, rung=None):
+        # The worker already picked the quality; rung requests get the same bytes
+        return self._jpeg
+
+    def base64(self):
+        if self._b64 is None:
+            self._b64 = base64.b64encode(self._jpeg)
+        return self._b64
+
+
+class SharedResult:
+    """Single-writer, many-reader latest result block."""
+
+    def __init__(self, shm, jpeg_capacity, owner):
+        self.shm = shm
+        self.name = shm.name
+        self.jpeg_capacity = jpeg_capacity
+        self.owner = owner
+        self.slot_size = SLOT_HEADER.size + jpeg_capacity
+        self.buf = shm.buf
+
+    @classmethod
+    def create(cls, jpeg_capacity=DEFAULT_JPEG_CAPACITY):
+        size = HEADER.size + 2 * (SLOT_HEADER.size + jpeg_capacity)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        shm.buf[:HEADER.size] = bytes(HEADER.size)
+        return cls(shm, jpeg_capacity, owner=True)
+
+    @classmethod
+    def attach(cls, name, jpeg_capacity=DEFAULT_JPEG_CAPACITY):
+        # Workers are children of the creator and share its resource tracker,
+        # so attaching does not take ownership; only the creator unlinks
+        return cls(shared_memory.SharedMemory(name=name), jpeg_capacity, owner=False)
+
+    def _slot_offset(self, seq):
+        return HEADER.size + (seq % 2) * self.slot_size
+
+    def header(self):
+        """(latest seq, heartbeat, frames, dropped)."""
+        return HEADER.unpack_from(self.buf, 0)
+
+    def heartbeat(self):
+        """Mark the worker alive without publishing a frame."""
+        seq, _, frames, dropped = HEADER.unpack_from(self.buf, 0)
+        HEADER.pack_into(self.buf, 0, seq, time.time(), frames, dropped)
+
+    def drop(self):
+        """Count a frame the worker processed but could not publish."""
+        seq, _, frames, dropped = HEADER.unpack_from(self.buf, 0)
+        HEADER.pack_into(self.buf, 0, seq, time.time(), frames, dropped + 1)
+
+    def write(self, finger_count, extended_fingers, palm_facing, jpeg, timestamp, latency_ms=0.0, stage_seconds=None):
+        """Publish one result. Called by the worker only.
+
+        stage_seconds maps WORKER_STAGES names to the time this frame spent in them.
+        """
+        stage_seconds = stage_seconds or {}
+        seq, _, frames, dropped = HEADER.unpack_from(self.buf, 0)
+        seq += 1
+        if len(jpeg) > self.jpeg_capacity:
+            # Publish the finger state without the image
+            jpeg = b''
+            dropped += 1
+        extended = bytes(extended_fingers[:MAX_EXTENDED])
+        offset = self._slot_offset(seq)
+        # Zero seq marks the slot as being written until the final seq lands
+        struct.pack_into('<Q', self.buf, offset, 0)
+        start = offset + SLOT_HEADER.size
+        self.buf[start:start + len(jpeg)] = jpeg
+        SLOT_HEADER.pack_into(self.buf, offset, 0, timestamp, latency_ms,
+                              *(stage_seconds.get(stage, 0.0) for stage in WORKER_STAGES),
+                              finger_count, bool(palm_facing), len(extended), extended, len(jpeg))
+        struct.pack_into('<Q', self.buf, offset, seq)
+        HEADER.pack_into(self.buf, 0, seq, time.time(), frames + 1, dropped)
+        return seq
+
+    def latest_seq(self):
+        return struct.unpack_from('<Q', self.buf, 0)[0]
+
+    def read(self, after=0):
+        """Copy out the newest result if its seq is above after; returns a dict or None."""
+        for _ in range(3):
+            seq = self.latest_seq()
+            if seq <= after:
+                return None
+            offset = self._slot_offset(seq)
+            slot_seq, timestamp, latency_ms, *fields = SLOT_HEADER.unpack_from(self.buf, offset)
+            if slot_seq != seq:
+                continue
+            timings = fields[:len(WORKER_STAGES)]
+            finger_count, palm, n_extended, extended, jpeg_len = fields[len(WORKER_STAGES):]
+            start = offset + SLOT_HEADER.size
+            jpeg = bytes(self.buf[start:start + jpeg_len])
+            # The writer may have lapped us and started on this slot while we copied
+            if struct.unpack_from('<Q', self.buf, offset)[0] != seq:
+                continue
+            return {
+                'seq': seq,
+                'timestamp': timestamp,
+                'latency_ms': latency_ms,
+                'finger_count': finger_count,
+                'extended_fingers': list(extended[:n_extended]),
+                'palm_facing': bool(palm),
+                'jpeg': jpeg,
+                'stage_seconds': {stage: seconds for stage, seconds in zip(WORKER_STAGES, timings) if seconds}
+            }
+        return None
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
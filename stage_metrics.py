@@ -0,0 +1,95 @@
+"""
+Low-overhead stage metrics with Prometheus text output
+- Fixed-bucket latency histograms, preallocated once per stage
+- Recording a sample is a bisect and two additions, no allocation
+- Simple counters for requests per endpoint
+- render() produces the Prometheus text exposition format
+"""
+
+from bisect import bisect_left
+
+# Upper bounds in seconds; spans a sub-millisecond flip to a stalled camera read
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.02, 0.035, 0.05, 0.075, 0.1, 0.25, 0.5, 1.0)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Latency histogram with preallocated buckets.
+
+    Increments are not locked: a sample racing another thread may very
+    rarely be lost, which is acceptable for monitoring.
+    """
+
+    __slots__ = ('bounds', 'counts', 'total')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.bounds = tuple(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)  # Last slot is +Inf
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.total += seconds
+
+    def samples(self, name, labels=()):
+        """Yield Prometheus sample lines with cumulative bucket counts."""
+        counts = list(self.counts)  # Consistent copy while writers keep going
+        cumulative = 0
+        for bound, count in zip(self.bounds, counts):
+            cumulative += count
+            yield f'{name}_bucket{_format_labels(labels + (("le", repr(bound)),))} {cumulative}'
+        cumulative += counts[-1]
+        yield f'{name}_bucket{_format_labels(labels + (("le", "+Inf"),))} {cumulative}'
+        yield f'{name}_sum{_format_labels(labels)} {self.total!r}'
+        yield f'{name}_count{_format_labels(labels)} {cumulative}'
+
+
+class StageMetrics:
+    """Per-stage latency histograms plus per-endpoint request counters."""
+
+    def __init__(self, stages, prefix='finger_counter', buckets=DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.stages = tuple(stages)
+        self.histograms = {stage: Histogram(buckets) for stage in self.stages}
+        self.requests = {}
+
+    def observe(self, stage, seconds):
+        """Record one stage duration; unknown stages are ignored."""
+        histogram = self.histograms.get(stage)
+        if histogram is not None:
+            histogram.observe(seconds)
+
+    def count_request(self, endpoint):
+        self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+    def render(self, extra=()):
+        """Prometheus text format.
+
+        extra holds caller-supplied metric families as
+        (name, type, help, [(labels, value), ...]) with labels a tuple of pairs.
+        """
+        name = f'{self.prefix}_stage_seconds'
+        lines = [f'# HELP {name} Time spent in each frame processing stage.', f'# TYPE {name} histogram']
+        for stage in self.stages:
+            lines.extend(self.histograms[stage].samples(name, (('stage', stage),)))
+
+        name = f'{self.prefix}_http_requests_total'
+        lines += [f'# HELP {name} HTTP requests by endpoint.', f'# TYPE {name} counter']
+        for endpoint, count in sorted(self.requests.items()):
+            lines.append(f'{name}{_format_labels((("endpoint", endpoint),))} {count}')
+
+        for family, kind, help_text, samples in extra:
+            family = f'{self.prefix}_{family}'
+            lines += [f'# HELP {family} {help_text}', f'# TYPE {family} {kind}']
+            for labels, value in samples:
+                lines.append(f'{family}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,91 @@
+"""
+Immutable game state snapshots
+- The frame processor builds a new snapshot per frame and publishes it by
+  swapping one reference, so readers never take a lock the producer needs
+- Each snapshot carries its status JSON already serialized, and builds its
+  frame JSON at most once
+"""
+
+import json
+import threading
+
+
+class StateSnapshot:
+    """One published frame's finger state. Immutable once built."""
+
+    __slots__ = ('frame_seq', 'state_seq', 'finger_count', 'extended_fingers',
+                 'palm_facing', 'timestamp', 'frame', 'status_json', '_frame_json')
+
+    def __init__(self, frame_seq=0, state_seq=0, finger_count=0, extended_fingers=(),
+                 palm_facing=False, timestamp=0.0, frame=None):
+        set_field = object.__setattr__
+        set_field(self, 'frame_seq', frame_seq)
+        set_field(self, 'state_seq', state_seq)
+        set_field(self, 'finger_count', finger_count)
+        set_field(self, 'extended_fingers', tuple(extended_fingers))
+        set_field(self, 'palm_facing', palm_facing)
+        set_field(self, 'timestamp', timestamp)
+        set_field(self, 'frame', frame)
+        set_field(self, 'status_json', json.dumps(self.status(), separators=(',', ':')).encode('utf-8'))
+        set_field(self, '_frame_json', None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('StateSnapshot is immutable')
+
+    def same_state(self, finger_count, extended_fingers, palm_facing):
+        return (finger_count, tuple(extended_fingers), palm_facing) == (
+            self.finger_count, self.extended_fingers, self.palm_facing)
+
+    def frame_json(self):
+        """The /api/frame body: status fields plus the base64 image, serialized once.
+
+        Built on first request rather than by the producer, so frames nobody
+        polls are never base64-encoded.
+        """
+        if self._frame_json is None and self.frame is not None:
+            meta = json.dumps({
+                'seq': self.frame_seq,
+                'finger_count': self.finger_count,
+                'extended_fingers': list(self.extended_fingers),
+                'palm_facing': self.palm_facing,
+                'timestamp': self.timestamp
+            }, separators=(',', ':')).encode('utf-8')
+            # Splice the image in directly instead of JSON-escaping a large string
+            body = b'{"image":"' + self.frame.base64() + b'",' + meta[1:]
+            object.__setattr__(self, '_frame_json', body)
+        return self._frame_json
+
+    def status(self):
+        """Finger state as a plain dict."""
+        return {
+            'seq': self.state_seq,
+            'finger_count': self.finger_count,
+            'extended_fingers': list(self.extended_fingers),
+            'palm_facing': self.palm_facing
+        }
+
+
+class SnapshotPublisher:
+    """Holds the latest snapshot and wakes readers waiting for a newer one."""
+
+    def __init__(self, initial=None):
+        self.current = initial if initial is not None else StateSnapshot()
+        self._cond = threading.Condition()
+
+    def latest(self):
+        # A single attribute read; the reference swap in publish() is atomic
+        return self.current
+
+    def publish(self, snapshot):
+        self.current = snapshot
+        with self._cond:
+            self._cond.notify_all()
+
+    def wait_for(self, predicate, timeout):
+        """Block until predicate(snapshot) is true or timeout passes; return the latest snapshot."""
+        snapshot = self.current
+        if predicate(snapshot):
+            return snapshot
+        with self._cond:
+            self._cond.wait_for(lambda: predicate(self.current), timeout=timeout)
+        return self.current
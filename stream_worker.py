@@ -0,0 +1,262 @@
+"""
+Per-stream worker processes
+- Each capture source gets a capture process and a detector process, so
+  several streams use several cores instead of sharing one GIL
+- Capture mirrors frames straight into a shared-memory FrameRing; the
+  detector copies the newest one out once and checks it was not overwritten
+  before detecting on it
+- Detectors publish the finger state, annotated JPEG and stage timings through a SharedResult
+- The web process republishes each new result as a StateSnapshot, so the
+  per-stream routes reuse the single-stream ETag, long-poll and MJPEG code
+"""
+
+import multiprocessing
+import threading
+import time
+
+import numpy as np
+
+from frame_ring import DEFAULT_SLOTS, FrameRing
+from shared_result import DEFAULT_JPEG_CAPACITY, SharedResult, StoredFrame
+from state_snapshot import SnapshotPublisher, StateSnapshot
+
+WORKER_STALE = 5.0     # Seconds without a heartbeat before a worker counts as stuck
+POLL_INTERVAL = 0.005  # Seconds between checks for a new result
+
+
+def parse_streams(spec):
+    """Parse 'name=source,...' (or bare sources, named by position) into [(id, source)]."""
+    streams = []
+    for i, item in enumerate(part.strip() for part in spec.split(',')):
+        if not item:
+            continue
+        name, sep, source = item.partition('=')
+        if not sep or not name.isidentifier():
+            name, source = str(i), item
+        streams.append((name, int(source) if source.isdigit() else source))
+    return streams
+
+
+def _ignore(stage, seconds):
+    pass
+
+
+def run_capture(stream_id, source, ring_name, stop):
+    """Capture process body: keep the ring filled with the newest mirrored frames."""
+    import cv2
+
+    from camera_capture import LatestFrameCapture
+
+    ring = FrameRing.attach(ring_name)
+    cap = LatestFrameCapture(source, width=1280, height=720, fps=30)
+    print(f"Stream '{stream_id}' capture started on {source!r}")
+    try:
+        while not stop.is_set():
+            start = time.perf_counter()
+            success, frame = cap.read(timeout=0.5)
+            if not success:
+                if not cap.isOpened():
+                    print(f"Stream '{stream_id}': source closed")
+                    break
+                continue
+            # Mirror straight into the shared slot; the flip is the only copy
+            cv2.flip(frame, 1, dst=ring.acquire(frame.shape))
+            ring.commit(cap.frame_grabbed_at, time.perf_counter() - start)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cap.release()
+        ring.close()
+
+
+def run_stream(stream_id, ring_name, result_name, stop, options):
+    """Detector process body: detect, annotate, encode and publish the newest ring frame until stop is set."""
+    from frame_encoder import AdaptiveEncoder
+    from frame_scheduler import FrameScheduler
+    from hand_detector import HandDetector, draw_hands
+    from landmark_recording import LandmarkRecorder
+    from motion_gate import MotionGate
+
+    ring = FrameRing.attach(ring_name)
+    result = SharedResult.attach(result_name, options.get('jpeg_capacity', DEFAULT_JPEG_CAPACITY))
+    # Stage timings of the current frame, handed to the web process with its result
+    timings = {}
+
+    def observe(stage, seconds):
+        # A lost ROI runs convert and inference twice on one frame
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+    detector = HandDetector(roi_tracking=options.get('roi_tracking', True),
+                            smoothing=options.get('smoothing', True), observe=observe)
+    encoder = AdaptiveEncoder(budget_ms=options.get('encode_budget_ms', 15), observe=observe)
+    scheduler = FrameScheduler(options.get('fps', 15), options.get('latency_budget_ms'))
+    motion_threshold = options.get('motion_threshold', 0)
+    motion_gate = MotionGate(motion_threshold, options.get('motion_pixel_threshold', 20)) if motion_threshold > 0 else None
+    record_path = options.get('record_landmarks')
+    recorder = LandmarkRecorder(record_path) if record_path else None
+    if recorder is not None:
+        print(f"Stream '{stream_id}' recording landmarks to {record_path}")
+    print(f"Stream '{stream_id}' detector warmed up in {detector.warm_up():.2f}s")
+    last_seq = 0
+    frame = None  # Private copy of the current ring frame, reused while the shape holds
+    try:
+        while not stop.is_set():
+            scheduler.wait()
+            item = ring.wait(last_seq, timeout=0.5)
+            if item is None:
+                result.heartbeat()
+                continue
+            last_seq, captured_at, capture_seconds, view = item
+            if frame is None or frame.shape != view.shape:
+                frame = np.empty_like(view)
+            np.copyto(frame, view)
+            view = item = None
+            if not ring.valid(last_seq):
+                # Capture lapped the ring during the copy; never let torn pixels
+                # reach the ROI tracker or the smoother
+                result.drop()
+                continue
+            # Ring frames are already mirrored, so the ROI box applies as is
+            roi = detector.roi_tracker.box if detector.roi_tracker else None
+            if motion_gate is not None and not motion_gate.changed(frame, roi, force=not detector.settled()):
+                # Nothing moved: the last published result still stands
+                result.heartbeat()
+                continue
+            timings.clear()
+            timings['capture'] = capture_seconds
+            multi_hand_landmarks, (total_fingers, all_extended, palm_facing) = detector.detect(frame)
+            if recorder is not None:
+                recorder.write(time.time(), detector.last_points)
+            if multi_hand_landmarks:
+                start = time.perf_counter()
+                draw_hands(frame, multi_hand_landmarks)
+                observe('draw', time.perf_counter() - start)
+            jpeg = encoder.encode(frame, encoder.select_rung())
+            latency = time.perf_counter() - captured_at
+            result.write(total_fingers, all_extended, palm_facing, jpeg, time.time(), latency * 1000.0, timings)
+            scheduler.frame_done(latency)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if recorder is not None:
+            recorder.close()
+        detector.close()
+        result.close()
+        ring.close()
+        print(f"Stream '{stream_id}' detector stopped")
+
+
+class StreamProcess:
+    """Owns one stream's capture and detector processes and republishes results in the web process."""
+
+    def __init__(self, stream_id, source, published=None, observe=None, **options):
+        self.stream_id = stream_id
+        self.source = source
+        self.options = options
+        self.observe = observe or _ignore  # observe(stage, seconds) for the worker's stage timings and publish
+        self.ring = FrameRing.create(options.get('ring_slots', DEFAULT_SLOTS))
+        self.result = SharedResult.create(options.get('jpeg_capacity', DEFAULT_JPEG_CAPACITY))
+        self.published = published if published is not None else SnapshotPublisher()
+        self.capture = None
+        self.process = None
+        self._stop = multiprocessing.Event()
+        self._running = False
+        self._poller = None
+        self.latency_ms = 0.0
+        self.started_at = None
+        self.first_result = None  # Seconds from start() to the first published result
+
+    def start(self):
+        self._stop.clear()
+        self.started_at = time.perf_counter()
+        self.capture = multiprocessing.Process(
+            target=run_capture,
+            args=(self.stream_id, self.source, self.ring.name, self._stop),
+            name=f'stream-{self.stream_id}-capture',
+            daemon=True
+        )
+        self.process = multiprocessing.Process(
+            target=run_stream,
+            args=(self.stream_id, self.ring.name, self.result.name, self._stop, self.options),
+            name=f'stream-{self.stream_id}',
+            daemon=True
+        )
+        self.capture.start()
+        self.process.start()
+        self._running = True
+        self._poller = threading.Thread(target=self._poll, daemon=True, name=f'stream-{self.stream_id}-poll')
+        self._poller.start()
+
+    def _poll(self):
+        """Turn each new shared result into a snapshot for this stream's readers."""
+        last_seq = 0
+        while self._running:
+            result = self.result.read(after=last_seq)
+            if result is None:
+                time.sleep(POLL_INTERVAL)
+                continue
+            last_seq = result['seq']
+            if self.first_result is None:
+                self.first_result = time.perf_counter() - self.started_at
+            previous = self.published.latest()
+            state_seq = previous.state_seq
+            if not previous.same_state(result['finger_count'], result['extended_fingers'], result['palm_facing']):
+                state_seq += 1
+            self.latency_ms = result['latency_ms']
+            for stage, seconds in result['stage_seconds'].items():
+                self.observe(stage, seconds)
+            start = time.perf_counter()
+            self.published.publish(StateSnapshot(
+                frame_seq=last_seq,
+                state_seq=state_seq,
+                finger_count=result['finger_count'],
+                extended_fingers=result['extended_fingers'],
+                palm_facing=result['palm_facing'],
+                timestamp=result['timestamp'],
+                frame=StoredFrame(last_seq, result['jpeg']) if result['jpeg'] else previous.frame
+            ))
+            self.observe('publish', time.perf_counter() - start)
+
+    def is_alive(self):
+        if self.process is None or not self.process.is_alive() or not self.capture.is_alive():
+            return False
+        _, heartbeat, _, _ = self.result.header()
+        # A worker that has not published or heartbeated yet may still be loading its model
+        return heartbeat == 0.0 or time.time() - heartbeat < WORKER_STALE
+
+    def ready(self):
+        """True once the warmed-up detector has published a result and the workers are still running."""
+        return self.first_result is not None and self.is_alive()
+
+    def stop(self, timeout=3.0):
+        self._stop.set()
+        self._running = False
+        for process in (self.capture, self.process):
+            if process is not None:
+                process.join(timeout)
+                if process.is_alive():
+                    process.terminate()
+                    process.join(1.0)
+        if self._poller is not None:
+            self._poller.join(1.0)
+
+    def close(self):
+        self.stop()
+        self.result.close()
+        self.ring.close()
+
+    def stats(self):
+        seq, heartbeat, frames, dropped = self.result.header()
+        return {
+            'source': str(self.source),
+            'alive': self.is_alive(),
+            'ready': self.ready(),
+            'first_result_s': round(self.first_result, 3) if self.first_result is not None else None,
+            'pid': self.process.pid if self.process else None,
+            'captured': self.ring.latest_seq(),
+            'frames': frames,
+            'dropped_frames': dropped,
+            'latency_ms': round(self.latency_ms, 2),
+            'heartbeat_age': round(time.time() - heartbeat, 2) if heartbeat else None,
+            'seq': seq
+        }